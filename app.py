@@ -22,21 +22,29 @@ A股财务综合分析系统 - 主应用模块
 更新：2025-11-10
 """
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
 import streamlit as st
 from datetime import datetime
-from typing import Optional
-from utils import analyze_fundamentals, run_connectivity_tests, fetch_valuation_data, get_user_points_info, calculate_recent_years, fetch_kline_data
+from typing import NamedTuple, Optional
+from utils import analyze_fundamentals, run_connectivity_tests, fetch_valuation_data, get_user_points_info, calculate_recent_years, fetch_kline_data, ValuationSnapshot
+import copy
+import io
 import json
 import os
+from types import SimpleNamespace
+from functools import lru_cache
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from cache_manager import data_cache
-from valuation import PRValuation
+from valuation import PRValuation, analyze_stock_valuation_cached
 from screening import run_full_market_screening, StockScreener
 import threading
 import time
-from constants import SECTOR_RULES
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from constants import SECTOR_RULES, SECTOR_THRESHOLDS
 
 # 页面配置
 st.set_page_config(
@@ -46,9 +54,17 @@ st.set_page_config(
 )
 
 # 数据文件路径
-HISTORY_FILE = "data/analysis_history.json"
+HISTORY_FILE = "data/analysis_history.jsonl"
+# 旧版整体JSON历史文件，首次访问时自动迁移为JSONL
+LEGACY_HISTORY_FILE = "data/analysis_history.json"
 os.makedirs("data", exist_ok=True)
 
+# 可选依赖：orjson解析/序列化比标准库json快3-5倍，未安装时退回json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 指数代码别名映射（常用宽基指数）
 INDEX_CODE_ALIASES = {
     "沪深300": "000300.SH",
@@ -63,15 +79,33 @@ INDEX_CODE_ALIASES = {
     "HSCEI": "HSCEI",
 }
 
+# 个股代码首字符 -> 交易所后缀（其余默认.SZ），一次哈希查表替代多次startswith
+_STOCK_SUFFIX_BY_FIRST = {
+    "6": ".SH",
+    "9": ".SH",
+    "8": ".BJ",
+}
+
+# 指数代码前3位 -> 交易所后缀（其余默认.SH）
+_INDEX_SUFFIX_BY_PREFIX = {
+    "399": ".SZ",
+    "159": ".SZ",
+    "150": ".SZ",
+    "560": ".SZ",
+}
+
 
+@lru_cache(maxsize=2048)
 def normalize_ts_code(raw_code: str, target_type: str) -> str:
     """
     规范化股票/指数代码，自动补全交易所后缀
-    
+
+    纯函数且入参是小字符串，lru_cache后每次rerun不再重复解析同一输入
+
     参数:
         raw_code: 用户输入的原始代码
         target_type: 标的类型（个股/宽基指数）
-        
+
     返回:
         带有交易所后缀的标准代码
     """
@@ -89,19 +123,11 @@ def normalize_ts_code(raw_code: str, target_type: str) -> str:
     if target_type == "宽基指数":
         if code in INDEX_CODE_ALIASES:
             return INDEX_CODE_ALIASES[code]
-        if code.startswith(("000", "001", "002", "003")):
-            return f"{code}.SH"
-        if code.startswith(("399", "159", "150", "560")):
-            return f"{code}.SZ"
-        return f"{code}.SH"
-    
+        return code + _INDEX_SUFFIX_BY_PREFIX.get(code[:3], ".SH")
+
     if len(code) == 6:
-        if code.startswith(("6", "9")):
-            return f"{code}.SH"
-        if code.startswith("8"):
-            return f"{code}.BJ"
-        return f"{code}.SZ"
-    
+        return code + _STOCK_SUFFIX_BY_FIRST.get(code[0], ".SZ")
+
     return code
 
 
@@ -124,41 +150,97 @@ if 'api_delay' not in st.session_state:
 class HistoryManager:
     """
     历史记录管理类
-    
+
     功能：
-        - 保存分析历史到JSON文件
+        - 以JSONL追加日志保存分析历史（新增记录只做一次顺序写入）
         - 加载历史记录
-        - 限制最多保留100条记录
-    
+        - 限制最多保留100条记录，定期压缩
+
     存储位置：
-        data/analysis_history.json
+        data/analysis_history.jsonl
     """
-    
+
+    # 距上次压缩以来的追加次数（每50次追加压缩一次文件）
+    _appends_since_compact = 0
+
+    @staticmethod
+    def _dump_line(record) -> bytes:
+        """序列化单条记录为一行JSONL"""
+        if orjson is not None:
+            return orjson.dumps(record) + b'\n'
+        # 紧凑分隔符：机器消费的文件无需缩进和空格
+        return (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _load_history_cached(mtime: float):
+        """按文件mtime缓存解析结果：文件未变化的重复rerun不再重新读盘/解析"""
+        try:
+            with open(HISTORY_FILE, 'rb') as f:
+                lines = f.read().splitlines()
+            loads = orjson.loads if orjson is not None else json.loads
+            records = [loads(line) for line in lines if line.strip()]
+            # 文件内最旧的在前，展示时最新的在前
+            records.reverse()
+            return records[:100]
+        except:
+            return []
+
+    @staticmethod
+    def _migrate_legacy_file():
+        """旧版整体JSON文件一次性迁移为JSONL追加日志"""
+        if os.path.exists(HISTORY_FILE) or not os.path.exists(LEGACY_HISTORY_FILE):
+            return
+        try:
+            with open(LEGACY_HISTORY_FILE, 'rb') as f:
+                raw = f.read()
+            records = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            HistoryManager.save_history(records[:100])
+            os.remove(LEGACY_HISTORY_FILE)
+        except:
+            pass
+
     @staticmethod
     def load_history():
+        HistoryManager._migrate_legacy_file()
         if os.path.exists(HISTORY_FILE):
             try:
-                with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
+                # 返回副本，避免调用方修改缓存中的列表
+                return list(HistoryManager._load_history_cached(os.path.getmtime(HISTORY_FILE)))
+            except OSError:
                 return []
         return []
-    
+
     @staticmethod
     def save_history(records):
+        """整体重写历史文件（清空/压缩时使用），落盘顺序为最旧在前"""
         try:
-            with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-                json.dump(records, f, ensure_ascii=False, indent=2)
+            os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+            with open(HISTORY_FILE, 'wb') as f:
+                for record in reversed(records[:100]):
+                    f.write(HistoryManager._dump_line(record))
+            # 文件已变化，清除读取缓存
+            HistoryManager._load_history_cached.cache_clear()
             return True
         except:
             return False
-    
+
     @staticmethod
     def add_record(record):
-        history = HistoryManager.load_history()
-        history.insert(0, record)
-        history = history[:100]
-        HistoryManager.save_history(history)
+        """追加一条记录：单次顺序写入一行，不再整文件重写"""
+        HistoryManager._migrate_legacy_file()
+        try:
+            os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+            with open(HISTORY_FILE, 'ab') as f:
+                f.write(HistoryManager._dump_line(record))
+            HistoryManager._load_history_cached.cache_clear()
+        except:
+            return
+        # 追加若干次后压缩一次，把文件收敛到最近100条
+        HistoryManager._appends_since_compact += 1
+        if HistoryManager._appends_since_compact >= 50:
+            HistoryManager._appends_since_compact = 0
+            HistoryManager.save_history(HistoryManager.load_history())
 
 
 def format_percentage(value: float) -> str:
@@ -176,6 +258,23 @@ def format_percentage(value: float) -> str:
     return f"{value * 100:.2f}%"
 
 
+def format_percentage_series(series: pd.Series, suffix: str = "%") -> pd.Series:
+    """
+    format_percentage的整列向量化版本
+
+    渲染表格前一次性格式化整列，替代循环内逐格f-string
+
+    参数:
+        series: 小数值Series（如0.6表示60%）
+        suffix: 追加的后缀（表头已带单位时传""）
+
+    返回:
+        格式化后的字符串Series，缺失值为"-"
+    """
+    pct = pd.to_numeric(series, errors='coerce') * 100
+    return pct.map(('{:.2f}' + suffix).format).where(pct.notna(), '-')
+
+
 def format_metric_value(
     value: Optional[float],
     spec: str = ".2f",
@@ -198,12 +297,106 @@ def format_metric_value(
         return default
     if isinstance(value, (int, float)) and pd.isna(value):
         return default
+    # 热路径：'.2f'是表格/图表里最常用的规格，直接走f-string，绕开通用format()
+    if spec == ".2f" and isinstance(value, (int, float)):
+        return f"{value:.2f}{suffix}"
     try:
         return f"{format(value, spec)}{suffix}"
     except (TypeError, ValueError):
         return default
 
 
+# 行业选项的元组与下标表：脚本每次rerun都会重建侧边栏，
+# 固化为模块常量后免去每次的keys物化和线性index扫描
+_SECTOR_KEYS = tuple(SECTOR_RULES.keys())
+_SECTOR_IDX = {key: idx for idx, key in enumerate(_SECTOR_KEYS)}
+
+
+# Tushare等级对应的API延迟（秒）：同样固化为模块常量，
+# 侧边栏rerun时不再重建dict和keys列表
+_DELAY_OPTIONS = (
+    ("未认证用户 (0-119分)", 31),
+    ("注册用户 (120-599分)", 13),
+    ("中级用户 (600-4999分)", 0.1),
+    ("高级用户 (5000+分)", 0),
+)
+_DELAY_LABELS = tuple(label for label, _ in _DELAY_OPTIONS)
+_DELAY_MAP = dict(_DELAY_OPTIONS)
+
+
+# 现金流结论的四段markdown模板：提升为模块常量，
+# 渲染时只做.format填充，不再每次重跑都重建整段三引号f-string
+_OCF_TMPL_EXCELLENT = """
+**现金流表现：**
+- ✅ 连续 **{max_consecutive}年** 收到真实现金
+- ✅ 近{total_years}年中有 **{ge_profit_count}年** 现金流≥账面利润（占比{cash_quality_pct:.0f}%）
+- ✅ 赚的是实实在在的钱，不是"账面富翁"
+
+**通俗解读：** 就像做生意，不仅账本上有利润，钱也真的收回来了。这种公司才是真赚钱！
+            """
+
+_OCF_TMPL_GOOD = """
+**现金流表现：**
+- ✅ 连续 **{max_consecutive}年** 有现金流入
+- ⚠️ 但有 **{not_ge_years}年** 收到的钱少于账面利润
+- ⚠️ 部分利润可能还在客户那里（应收账款）
+
+**通俗解读：** 生意是赚钱的，但有些钱还没收回来，要注意是否能收回。
+            """
+
+_OCF_TMPL_UNSTABLE = """
+**现金流表现：**
+- ⚠️ 最长连续 **{max_consecutive}年** 有现金（标准要求≥{required_years}年）
+- ⚠️ 现金流断断续续，不够稳定
+- ⚠️ 有些年份钱收不回来
+
+**通俗解读：** 像做生意时好时坏，今年赚了钱收回来，明年又收不回。这种不稳定性需要警惕。
+            """
+
+_OCF_TMPL_POOR = """
+**现金流表现：**
+- ❌ 最长只连续 **{max_consecutive}年** 有现金
+- ❌ 现金流很不稳定
+- ❌ 账面有利润，但钱大多没收回来
+
+**通俗解读：** 就像欠条一大堆，看着账面有钱，实际钱包空空。这种公司风险很高！
+
+**投资建议：** 强烈建议回避
+            """
+
+
+# 估值数据各字段的格式化规格表：字段名 -> (格式规格, 单位后缀)
+# 提升为模块常量，避免每次渲染重建
+_VAL_DATA_SPECS = {
+    'close': ('.2f', '元'),
+    'pe_ttm': ('.2f', ''),
+    'roe_waa': ('.2f', '%'),
+    'eps': ('.2f', '元'),
+    'dividend_per_share': ('.2f', '元'),
+}
+
+
+def fmt_all(d: dict, keys, specs=_VAL_DATA_SPECS) -> SimpleNamespace:
+    """
+    批量格式化字典中的多个指标
+
+    一次性生成所有展示字符串，替代渲染代码里分散的
+    format_metric_value调用，规格统一维护在_VAL_DATA_SPECS中。
+
+    参数:
+        d: 数据字典或ValuationSnapshot（例如val_data）
+        keys: 要格式化的字段名列表
+        specs: 字段名 -> (格式规格, 单位后缀) 映射
+
+    返回:
+        SimpleNamespace，按字段名取预格式化字符串（如v.pe_ttm）
+    """
+    return SimpleNamespace(**{
+        k: format_metric_value(d.get(k), *specs.get(k, ('.2f', '')))
+        for k in keys
+    })
+
+
 def format_number(value: float, unit="万元") -> str:
     """格式化数字"""
     if value is None or pd.isna(value):
@@ -263,43 +456,98 @@ def evaluate_year(row, sector_rules) -> dict:
     return score, checks
 
 
+def _longest_run_of_ones(mask: int) -> int:
+    """
+    整数位掩码中最长连续1的长度
+
+    mask &= mask << 1 每轮消去每段游程的最低位，
+    循环轮数即最长游程长度（年份窗口≤10年，至多循环10次）
+    """
+    n = 0
+    while mask:
+        mask &= mask << 1
+        n += 1
+    return n
+
+
+def _ocf_consecutive_core(pos: np.ndarray, ge_profit: np.ndarray, k: int) -> tuple:
+    """
+    现金流连续性核心计算
+
+    独立出数组级入口，方便批量筛选流水线直接传入提取好的数组，
+    不必为每只股票重复做DataFrame列访问
+
+    参数:
+        pos: 各年现金流为正的布尔数组
+        ge_profit: 各年现金流≥净利润的布尔数组
+        k: 要求的连续年数
+
+    返回:
+        (是否连续k年为正, 为正年数, 现金流≥利润年数, 总年数, 最长连续年数)
+    """
+    # 年份窗口很小（≤10年），把逐年布尔打包成位掩码后用整数位运算
+    # 求最长游程，比分组/分箱的数组机制更省（免去若干临时数组）
+    pos_mask = 0
+    for flag in pos.tolist():
+        pos_mask = (pos_mask << 1) | int(flag)
+    max_consecutive = _longest_run_of_ones(pos_mask)
+
+    positive_count = int(pos.sum())
+    ge_profit_count = int(ge_profit.sum())
+    total = int(pos.size)
+    ocf_consecutive_ok = max_consecutive >= k
+
+    return ocf_consecutive_ok, positive_count, ge_profit_count, total, max_consecutive
+
+
+def _score_core(debt_ratio: np.ndarray, gross_margin: np.ndarray, ocf_positive: np.ndarray,
+                debt_ratio_max: float, gross_margin_min: float) -> tuple:
+    """
+    年度评分核心计算（纯NumPy数组版）
+
+    NaN视为不达标（与evaluate_year中逐行pd.notna检查的语义一致，
+    NaN与任何数比较结果即为False，无需单独isnan处理）
+
+    返回:
+        (负债率达标数组, 毛利率达标数组, 年度得分数组0-3)
+    """
+    # 缩放标量阈值而不是整列指标，单次比较完成判定，不产生中间数组
+    debt_pass = debt_ratio <= debt_ratio_max / 100.0
+    gm_pass = gross_margin >= gross_margin_min / 100.0
+    score_arr = debt_pass.astype(np.int8) + gm_pass.astype(np.int8) + ocf_positive.astype(np.int8)
+    return debt_pass, gm_pass, score_arr
+
+
 def check_ocf_consecutive(metrics: pd.DataFrame, k: int) -> tuple:
     """
     检查经营现金流连续性
-    
+
     核心问题：连续k年（通常3-5年）经营现金流为正吗？
-    
+
     参数:
         metrics: 财务指标DataFrame
         k: 要求的连续年数
-        
+
     返回:
         (是否连续k年为正, 为正年数, 现金流≥利润年数, 总年数, 最长连续年数)
     """
-    consecutive = 0
-    max_consecutive = 0
-    positive_count = 0
-    ge_profit_count = 0
-    
-    for _, row in metrics.iterrows():
-        if row['cashflow_positive']:
-            consecutive += 1
-            positive_count += 1
-            max_consecutive = max(max_consecutive, consecutive)
-        else:
-            consecutive = 0
-        
-        if row['cashflow_ge_profit']:
-            ge_profit_count += 1
-    
-    total = len(metrics)
-    ocf_consecutive_ok = max_consecutive >= k
-    
-    return ocf_consecutive_ok, positive_count, ge_profit_count, total, max_consecutive
+    pos = metrics['cashflow_positive'].to_numpy().astype(bool)
+    ge_profit = metrics['cashflow_ge_profit'].to_numpy().astype(bool)
+    return _ocf_consecutive_core(pos, ge_profit, k)
 
 
 def evaluate_metrics(metrics: pd.DataFrame, sector_rules: dict, ocf_k: int) -> dict:
     """评估财务指标"""
+    return _evaluate_with_thresholds(
+        metrics,
+        sector_rules['debt_ratio_max'], sector_rules['gross_margin_min'],
+        ocf_k
+    )
+
+
+def _evaluate_with_thresholds(metrics: pd.DataFrame, debt_ratio_max: float,
+                              gross_margin_min: float, ocf_k: int) -> dict:
+    """评估财务指标（阈值标量版，热路径只拿两个浮点数，不传整个规则字典）"""
     if metrics.empty:
         return {
             "avg_score": 0, 
@@ -310,21 +558,39 @@ def evaluate_metrics(metrics: pd.DataFrame, sector_rules: dict, ocf_k: int) -> d
             "ocf_info": {}
         }
     
-    scores = []
-    year_checks = []
-    
-    # 评估每年
-    for _, row in metrics.iterrows():
-        score, checks = evaluate_year(row, sector_rules)
-        scores.append(score)
-        year_checks.append(checks)
-    
-    avg_score = sum(scores) / len(scores) if scores else 0
+    # 列式提取为NumPy数组，整列一次性完成判定（避免逐行iterrows+标量检查）
+    debt_ratio = pd.to_numeric(metrics['debt_ratio'], errors='coerce').to_numpy(dtype=float)
+    gross_margin = pd.to_numeric(metrics['gross_margin'], errors='coerce').to_numpy(dtype=float)
+    ocf_positive = metrics['cashflow_positive'].to_numpy(dtype=bool)
+    ocf_ge_profit = metrics['cashflow_ge_profit'].to_numpy(dtype=bool)
+
+    # 年度得分 = 三项检查的布尔和（0-3分），核心计算与批量入口共用
+    debt_pass, gm_pass, score_arr = _score_core(
+        debt_ratio, gross_margin, ocf_positive, debt_ratio_max, gross_margin_min
+    )
+    scores = score_arr.tolist()
+    year_checks = [
+        {
+            'debt_ratio_pass': dp,
+            'gross_margin_pass': gp,
+            'ocf_positive': op,
+            'ocf_ge_profit': gep,
+        }
+        for dp, gp, op, gep in zip(
+            debt_pass.tolist(), gm_pass.tolist(),
+            ocf_positive.tolist(), ocf_ge_profit.tolist()
+        )
+    ]
+
+    # 汇总量直接在得分数组上算（C层归约），不再遍历Python列表
+    avg_score = float(score_arr.mean()) if len(score_arr) else 0
     latest_score = scores[-1] if scores else 0
-    red_flags = sum(1 for s in scores if s < 2)
+    red_flags = int((score_arr < 2).sum())
     
-    # 检查OCF连续性
-    ocf_ok, pos_cnt, ge_cnt, total, max_cons = check_ocf_consecutive(metrics, ocf_k)
+    # 检查OCF连续性：复用上面已提取的布尔数组，避免再走一遍DataFrame列提取
+    ocf_ok, pos_cnt, ge_cnt, total, max_cons = _ocf_consecutive_core(
+        ocf_positive, ocf_ge_profit, ocf_k
+    )
     
     return {
         "avg_score": avg_score,
@@ -342,6 +608,43 @@ def evaluate_metrics(metrics: pd.DataFrame, sector_rules: dict, ocf_k: int) -> d
     }
 
 
+def _metrics_cache_key(metrics: pd.DataFrame) -> str:
+    """计算metrics内容哈希，作为缓存键（比Streamlit默认的DataFrame哈希快）"""
+    import hashlib
+    return hashlib.blake2b(
+        pd.util.hash_pandas_object(metrics, index=True).values.tobytes()
+    ).hexdigest()
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _evaluate_metrics_by_key(metrics_key: str, thresholds: tuple, ocf_k: int) -> dict:
+    """按内容哈希缓存的评估入口（仅在缓存未命中时真正计算）"""
+    metrics = st.session_state.get('_metrics_by_key', {}).get(metrics_key)
+    if metrics is None:
+        # 理论上不会发生：调用方总是先注册metrics再查缓存
+        metrics = pd.DataFrame()
+    return _evaluate_with_thresholds(metrics, thresholds[0], thresholds[1], ocf_k)
+
+
+def evaluate_metrics_cached(metrics: pd.DataFrame, sector_rules: dict, ocf_k: int) -> dict:
+    """
+    evaluate_metrics的缓存版本
+
+    Streamlit每次widget交互都会重跑整个脚本，评估结果只取决于
+    (metrics内容, 行业规则, OCF年数)，用st.cache_data避免重复计算。
+    """
+    if metrics.empty:
+        return evaluate_metrics(metrics, sector_rules, ocf_k)
+    key = _metrics_cache_key(metrics)
+    st.session_state.setdefault('_metrics_by_key', {})[key] = metrics
+    # 缓存键只需两个阈值标量，不必序列化整个规则字典
+    thresholds = SECTOR_THRESHOLDS.get(
+        sector_rules.get('name'),
+        (sector_rules['debt_ratio_max'], sector_rules['gross_margin_min'])
+    )
+    return _evaluate_metrics_by_key(key, thresholds, ocf_k)
+
+
 def render_audit_opinion(audit_records):
     """渲染审计意见"""
     st.subheader("1️⃣ 财报审计意见")
@@ -370,24 +673,31 @@ def render_audit_opinion(audit_records):
     
     # 详细审计记录
     with st.expander("📋 历年审计意见详情", expanded=False):
-        audit_data = [{
-            "报告期": r.end_date,
-            "公告日期": r.ann_date,
-            "审计意见": r.audit_result,
-            "是否标准无保留": "✅ 是" if r.is_standard else "❌ 否",
-            "会计师事务所": r.audit_agency,
-            "签字会计师": r.audit_sign,
-        } for r in audit_records]
-        st.dataframe(pd.DataFrame(audit_data), use_container_width=True, hide_index=True)
+        # 直接用dataclass字段建表，标准与否列整列np.where，免去逐条拼dict
+        # （is_standard是property不在__dict__里，这里按同样规则整列计算）
+        raw_df = pd.DataFrame.from_records(r.__dict__ for r in audit_records)
+        is_standard = raw_df['audit_result'].str.contains('标准无保留意见', regex=False, na=False)
+        audit_df = pd.DataFrame({
+            "报告期": raw_df['end_date'],
+            "公告日期": raw_df['ann_date'],
+            "审计意见": raw_df['audit_result'],
+            "是否标准无保留": np.where(is_standard, "✅ 是", "❌ 否"),
+            "会计师事务所": raw_df['audit_agency'],
+            "签字会计师": raw_df['audit_sign'],
+        })
+        st.dataframe(audit_df, use_container_width=True, hide_index=True)
 
 
 def render_core_indicators(metrics: pd.DataFrame, evaluation: dict, sector_rules: dict):
     """渲染三大核心指标"""
     st.subheader("2️⃣ 三大核心指标分析")
-    
+
     if metrics.empty:
         st.warning("⚠️ 未获取到财务数据")
         return
+
+    # session_state访问走代理有额外开销，渲染前绑定为局部变量
+    ocf_k = st.session_state.ocf_consecutive_years
     
     # 重要：确保只使用年度数据（end_date以1231结尾），过滤掉可能的季度数据
     if not metrics.empty and 'end_date' in metrics.columns:
@@ -404,7 +714,10 @@ def render_core_indicators(metrics: pd.DataFrame, evaluation: dict, sector_rules
     
     with col1:
         st.markdown("##### 2.1 资产负债率")
-        debt_ratio_pct = latest['debt_ratio'] * 100 if pd.notna(latest['debt_ratio']) else None
+        # NaN自比较为False：标量判缺失走x==x，绕开pandas的逐标量分发开销
+        # （缓存还原的全空列可能给出None，需一并排除）
+        debt_val = latest['debt_ratio']
+        debt_ratio_pct = debt_val * 100 if debt_val is not None and debt_val == debt_val else None
         if debt_ratio_pct is not None:
             is_pass = debt_ratio_pct <= sector_rules['debt_ratio_max']
             st.metric(
@@ -424,7 +737,8 @@ def render_core_indicators(metrics: pd.DataFrame, evaluation: dict, sector_rules
     
     with col2:
         st.markdown("##### 2.2 毛利率")
-        gross_margin_pct = latest['gross_margin'] * 100 if pd.notna(latest['gross_margin']) else None
+        gm_val = latest['gross_margin']
+        gross_margin_pct = gm_val * 100 if gm_val is not None and gm_val == gm_val else None
         if gross_margin_pct is not None:
             is_pass = gross_margin_pct >= sector_rules['gross_margin_min']
             st.metric(
@@ -453,7 +767,7 @@ def render_core_indicators(metrics: pd.DataFrame, evaluation: dict, sector_rules
         if ocf_info['consecutive_ok']:
             st.success(f"✅ 连续{ocf_info['max_consecutive']}年为正")
         else:
-            st.warning(f"⚠️ 最长连续{ocf_info['max_consecutive']}年为正（要求≥{st.session_state.ocf_consecutive_years}年）")
+            st.warning(f"⚠️ 最长连续{ocf_info['max_consecutive']}年为正（要求≥{ocf_k}年）")
         
         # 第二问：是否持续≥净利润？
         ratio = ocf_info['ge_profit_count'] / ocf_info['total_years'] if ocf_info['total_years'] > 0 else 0
@@ -465,6 +779,7 @@ def render_core_indicators(metrics: pd.DataFrame, evaluation: dict, sector_rules
         st.caption('💡 说明"赚到了真金白银"的能力')
 
 
+@st.fragment
 def render_year_health_table(metrics: pd.DataFrame, evaluation: dict, sector_rules: dict):
     """渲染年度财务健康度表"""
     st.subheader("🚦 年度财务健康度")
@@ -482,7 +797,7 @@ def render_year_health_table(metrics: pd.DataFrame, evaluation: dict, sector_rul
     
     # 显示年份范围和实际数据年份（显示所有获取到的数据）
     if not metrics.empty:
-        actual_years = sorted([row['end_date'][:4] for _, row in metrics.iterrows()])
+        actual_years = sorted(metrics['end_date'].str[:4].tolist())
         st.info(f"📊 共获取到 {len(metrics)} 个年度数据：{', '.join(actual_years)}（最新年份在上方）")
         # 如果数据少于期望的5年，给出提示
         if len(metrics) < 5:
@@ -490,80 +805,86 @@ def render_year_health_table(metrics: pd.DataFrame, evaluation: dict, sector_rul
     else:
         st.caption(f"共分析 {len(metrics)} 个年度数据（最新年份在上方）")
     
+    # 进循环前整列切好年份字符串，循环内不再逐行做Python切片
+    years = metrics['end_date'].str[:4].tolist()
+    # 进循环前整列格式化百分比字符串，循环内只做索引
+    debt_strs = format_percentage_series(metrics['debt_ratio']).tolist()
+    gm_strs = format_percentage_series(metrics['gross_margin']).tolist()
+    # 现金流/利润同理整列换算成亿元（缺失按0），免去循环内逐行pd.notna标量判定
+    ocf_vals = (metrics['n_cashflow_act'].fillna(0) / 100000000).tolist()
+    profit_vals = (metrics['n_income'].fillna(0) / 100000000).tolist()
+    # 通过与否图标整列np.where预生成，循环内直接取下标（不再逐行三元表达式）
+    checks_df = pd.DataFrame(evaluation['year_checks']).iloc[:len(metrics)]
+    debt_icons = np.where(checks_df['debt_ratio_pass'], '✅', '❌')
+    gm_icons = np.where(checks_df['gross_margin_pass'], '✅', '❌')
+    ocf_icons = np.where(checks_df['ocf_positive'], '✅', '❌')
+
     # 按年份倒序显示（最新的在上面）
     # metrics 已经是按 end_date 降序排列的，所以直接正序遍历即可
-    for idx in range(len(metrics)):
-        row = metrics.iloc[idx]
-        year = row['end_date'][:4]
+    # itertuples避免每次.iloc构造Series的开销
+    for idx, row in enumerate(metrics.itertuples(index=False)):
+        year = years[idx]
         checks = evaluation['year_checks'][idx]
         score = evaluation['scores'][idx]
-        
-        # 创建一个容器（优化显示比例）
-        with st.container():
-            # 年份和得分（优化比例：年份占更大比例，更清晰）
-            col_year, col_score = st.columns([2, 3])
-            with col_year:
-                st.markdown(f"### {year}")
-            with col_score:
-                score_dots = "🟢" * score + "⚪" * (3 - score)
-                st.markdown(f"**年度得分：** {score}/3 {score_dots}")
-            
-            # 三个指标横向排列（等宽，更美观）
-            cols = st.columns(3)
-            
-            with cols[0]:
-                debt_ratio_pct = row['debt_ratio'] * 100 if pd.notna(row['debt_ratio']) else None
-                if debt_ratio_pct is not None:
-                    icon = "✅" if checks['debt_ratio_pass'] else "❌"
-                    st.markdown(f"{icon} **资产负债率** {debt_ratio_pct:.2f}%")
-                else:
-                    st.markdown("❌ **资产负债率** 数据缺失")
-            
-            with cols[1]:
-                gross_margin_pct = row['gross_margin'] * 100 if pd.notna(row['gross_margin']) else None
-                if gross_margin_pct is not None:
-                    icon = "✅" if checks['gross_margin_pass'] else "❌"
-                    st.markdown(f"{icon} **毛利率** {gross_margin_pct:.2f}%")
+
+        # 年份与得分合并为一次markdown输出，并去掉纯包装的container：
+        # 每年少发3个容器/列delta和一次markdown往返，版式基本不变
+        score_dots = "🟢" * score + "⚪" * (3 - score)
+        st.markdown(f"### {year} ｜ 年度得分 {score}/3 {score_dots}")
+
+        # 三个指标横向排列（等宽，更美观）
+        cols = st.columns(3)
+
+        with cols[0]:
+            if debt_strs[idx] != "-":
+                st.markdown(f"{debt_icons[idx]} **资产负债率** {debt_strs[idx]}")
+            else:
+                st.markdown("❌ **资产负债率** 数据缺失")
+
+        with cols[1]:
+            if gm_strs[idx] != "-":
+                st.markdown(f"{gm_icons[idx]} **毛利率** {gm_strs[idx]}")
+            else:
+                st.markdown("❌ **毛利率** 数据缺失")
+                # 检查具体缺失原因（列是静态已知的，直接按属性访问）
+                revenue = getattr(row, 'revenue', 0)
+                oper_cost = getattr(row, 'oper_cost', 0)
+                if pd.isna(revenue) or revenue == 0:
+                    st.caption(f"💡 原因：营业收入(revenue)缺失或为0")
+                elif pd.isna(oper_cost):
+                    st.caption(f"💡 原因：营业成本(oper_cost)缺失")
                 else:
-                    st.markdown("❌ **毛利率** 数据缺失")
-                    # 检查具体缺失原因
-                    revenue = row.get('revenue', 0)
-                    oper_cost = row.get('oper_cost', 0)
-                    if pd.isna(revenue) or revenue == 0:
-                        st.caption(f"💡 原因：营业收入(revenue)缺失或为0")
-                    elif pd.isna(oper_cost):
-                        st.caption(f"💡 原因：营业成本(oper_cost)缺失")
-                    else:
-                        st.caption(f"💡 原因：Tushare原始数据缺失，无法计算")
-            
-            with cols[2]:
-                icon = "✅" if checks['ocf_positive'] else "❌"
-                ocf_val = row['n_cashflow_act'] / 100000000 if pd.notna(row['n_cashflow_act']) else 0
-                profit_val = row['n_income'] / 100000000 if pd.notna(row['n_income']) else 0
-                
-                if checks['ocf_positive']:
-                    st.markdown(f"{icon} **经营净现金流≥0**")
-                    # 显示现金流和净利润的对比（单位：亿元）
-                    if checks['ocf_ge_profit']:
-                        diff = ocf_val - profit_val
-                        st.caption(f"✅ 收到现金{ocf_val:.2f}亿 > 账面利润{profit_val:.2f}亿，多{diff:.2f}亿")
-                        st.success("💰 结论：赚到了真金白银！")
-                    else:
-                        diff = profit_val - ocf_val
-                        st.caption(f"❌ 收到现金{ocf_val:.2f}亿 < 账面利润{profit_val:.2f}亿，少{diff:.2f}亿")
-                        st.warning("⚠️ 结论：账面赚钱，但钱没收回来")
+                    st.caption(f"💡 原因：Tushare原始数据缺失，无法计算")
+
+        with cols[2]:
+            icon = ocf_icons[idx]
+            ocf_val = ocf_vals[idx]
+            profit_val = profit_vals[idx]
+
+            if checks['ocf_positive']:
+                st.markdown(f"{icon} **经营净现金流≥0**")
+                # 显示现金流和净利润的对比（单位：亿元）
+                if checks['ocf_ge_profit']:
+                    diff = ocf_val - profit_val
+                    st.caption(f"✅ 收到现金{ocf_val:.2f}亿 > 账面利润{profit_val:.2f}亿，多{diff:.2f}亿")
+                    st.success("💰 结论：赚到了真金白银！")
                 else:
-                    st.markdown(f"{icon} **经营净现金流<0**")
-                    st.caption(f"收到现金{ocf_val:.2f}亿，账面利润{profit_val:.2f}亿")
-                    st.error("🚨 结论：不仅没赚到钱，还在往外流失！")
-            
-            st.divider()
+                    diff = profit_val - ocf_val
+                    st.caption(f"❌ 收到现金{ocf_val:.2f}亿 < 账面利润{profit_val:.2f}亿，少{diff:.2f}亿")
+                    st.warning("⚠️ 结论：账面赚钱，但钱没收回来")
+            else:
+                st.markdown(f"{icon} **经营净现金流<0**")
+                st.caption(f"收到现金{ocf_val:.2f}亿，账面利润{profit_val:.2f}亿")
+                st.error("🚨 结论：不仅没赚到钱，还在往外流失！")
+
+        st.divider()
 
 
-def render_health_charts(metrics: pd.DataFrame):
-    """渲染年度财务健康度图表"""
+@st.fragment
+def render_health_charts(metrics: pd.DataFrame, evaluation: dict):
+    """渲染年度财务健康度图表（evaluation由调用方传入，避免重复评估）"""
     st.subheader("📈 年度财务健康度图表")
-    
+
     if metrics.empty:
         st.warning("无数据")
         return
@@ -587,76 +908,84 @@ def render_health_charts(metrics: pd.DataFrame):
     if not metrics.empty:
         # 按end_date去重，保留每个年份的最后一条记录（最新的）
         metrics = metrics.drop_duplicates(subset='end_date', keep='last').sort_values('end_date').reset_index(drop=True)
-        print(f"🔍 图表生成：使用{len(metrics)}条年度数据，年份：{[row['end_date'][:4] for _, row in metrics.iterrows()]}")
-    
+        print(f"🔍 图表生成：使用{len(metrics)}条年度数据，年份：{metrics['end_date'].str[:4].tolist()}")
+
     # 使用过滤后的年度数据生成图表
     # 使用整数年份作为X轴，避免Plotly自动处理重复值
-    years = [int(row['end_date'][:4]) for _, row in metrics.iterrows()]
-    debt_ratios = [row['debt_ratio'] * 100 if pd.notna(row['debt_ratio']) else None for _, row in metrics.iterrows()]
-    gross_margins = [row['gross_margin'] * 100 if pd.notna(row['gross_margin']) else None for _, row in metrics.iterrows()]
-    ocfs = [row['n_cashflow_act'] / 100000000 if pd.notna(row['n_cashflow_act']) else None for _, row in metrics.iterrows()]
-    profits = [row['n_income'] / 100000000 if pd.notna(row['n_income']) else None for _, row in metrics.iterrows()]
-    
-    # 创建子图
+    # 列式一次性提取全部序列（Plotly原生支持NaN断点，无需逐行pd.notna判断）
+    years = tuple(metrics['end_date'].str[:4].astype(int))
+    debt_ratios = tuple(pd.to_numeric(metrics['debt_ratio'], errors='coerce') * 100)
+    gross_margins = tuple(pd.to_numeric(metrics['gross_margin'], errors='coerce') * 100)
+    ocfs = tuple(metrics['n_cashflow_act'] / 100000000)
+    profits = tuple(metrics['n_income'] / 100000000)
+
+    fig = _build_health_fig(years, debt_ratios, gross_margins, ocfs, profits,
+                            tuple(evaluation['scores']))
+
+    st.plotly_chart(fig, use_container_width=True)
+
+
+@st.cache_resource
+def _health_fig_template():
+    """
+    健康度2x2子图骨架（进程级只构建一次）
+
+    make_subplots的行列映射和8次坐标轴配置全部发生在这里；
+    每次真正建图时只复制骨架并整体填入数据traces
+    """
     fig = make_subplots(
         rows=2, cols=2,
         subplot_titles=('资产负债率趋势', '毛利率趋势', '经营现金流趋势', '年度得分趋势')
     )
-    
-    # 资产负债率
-    fig.add_trace(
-        go.Scatter(x=years, y=debt_ratios, mode='lines+markers', name='资产负债率(%)',
-                   line=dict(color='blue', width=2), marker=dict(size=8)),
-        row=1, col=1
-    )
-    
-    # 毛利率
-    fig.add_trace(
-        go.Scatter(x=years, y=gross_margins, mode='lines+markers', name='毛利率(%)',
-                   line=dict(color='orange', width=2), marker=dict(size=8)),
-        row=1, col=2
-    )
-    
-    # 经营现金流 vs 净利润
-    fig.add_trace(
-        go.Scatter(x=years, y=ocfs, mode='lines+markers', name='经营现金流(亿)',
-                   line=dict(color='purple', width=2), marker=dict(size=8)),
-        row=2, col=1
-    )
-    fig.add_trace(
-        go.Scatter(x=years, y=profits, mode='lines+markers', name='净利润(亿)',
-                   line=dict(color='green', width=2, dash='dash'), marker=dict(size=8)),
-        row=2, col=1
-    )
-    
-    # 年度得分
-    sector_rules = SECTOR_RULES[st.session_state.selected_sector]
-    evaluation = evaluate_metrics(metrics, sector_rules, st.session_state.ocf_consecutive_years)
-    
-    fig.add_trace(
-        go.Scatter(x=years, y=evaluation['scores'], mode='lines+markers', name='年度得分',
-                   line=dict(color='red', width=2), marker=dict(size=10)),
-        row=2, col=2
-    )
-    
-    # 更新布局
+
     # 重要：设置X轴为整数年份，避免显示小数（如2023.2, 2023.4）
     # 使用线性类型，每年一个刻度，确保只显示整数年份
     fig.update_xaxes(title_text="年份", type='linear', tickmode='linear', dtick=1, row=1, col=1)
     fig.update_xaxes(title_text="年份", type='linear', tickmode='linear', dtick=1, row=1, col=2)
     fig.update_xaxes(title_text="年份", type='linear', tickmode='linear', dtick=1, row=2, col=1)
     fig.update_xaxes(title_text="年份", type='linear', tickmode='linear', dtick=1, row=2, col=2)
-    
+
     fig.update_yaxes(title_text="资产负债率(%)", row=1, col=1)
     fig.update_yaxes(title_text="毛利率(%)", row=1, col=2)
     fig.update_yaxes(title_text="金额(亿元)", row=2, col=1)
     fig.update_yaxes(title_text="年度得分", row=2, col=2)
-    
-    fig.update_layout(height=600, showlegend=False)
-    
-    st.plotly_chart(fig, use_container_width=True)
-
 
+    fig.update_layout(height=600, showlegend=False)
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def _build_health_fig(years: tuple, debt_ratios: tuple, gross_margins: tuple,
+                      ocfs: tuple, profits: tuple, scores: tuple):
+    """构建健康度子图（入参全为元组，数据不变的rerun直接命中st.cache_data）"""
+    # 复制骨架后一次add_traces填入全部traces，不再逐条add_trace
+    # 走行列->坐标轴映射逻辑（轴引用与make_subplots的2x2布局一致）
+    fig = copy.copy(_health_fig_template())
+    fig.add_traces((
+        # 资产负债率（左上）
+        go.Scattergl(x=years, y=debt_ratios, mode='lines+markers', name='资产负债率(%)',
+                     line=dict(color='blue', width=2), marker=dict(size=8),
+                     xaxis='x', yaxis='y'),
+        # 毛利率（右上）
+        go.Scattergl(x=years, y=gross_margins, mode='lines+markers', name='毛利率(%)',
+                     line=dict(color='orange', width=2), marker=dict(size=8),
+                     xaxis='x2', yaxis='y2'),
+        # 经营现金流 vs 净利润（左下）
+        go.Scattergl(x=years, y=ocfs, mode='lines+markers', name='经营现金流(亿)',
+                     line=dict(color='purple', width=2), marker=dict(size=8),
+                     xaxis='x3', yaxis='y3'),
+        go.Scattergl(x=years, y=profits, mode='lines+markers', name='净利润(亿)',
+                     line=dict(color='green', width=2, dash='dash'), marker=dict(size=8),
+                     xaxis='x3', yaxis='y3'),
+        # 年度得分（右下）
+        go.Scattergl(x=years, y=scores, mode='lines+markers', name='年度得分',
+                     line=dict(color='red', width=2), marker=dict(size=10),
+                     xaxis='x4', yaxis='y4'),
+    ))
+    return fig
+
+
+@st.fragment
 def render_detailed_table(metrics: pd.DataFrame, evaluation: dict):
     """渲染详细财务数据表"""
     if metrics.empty:
@@ -670,25 +999,23 @@ def render_detailed_table(metrics: pd.DataFrame, evaluation: dict):
             st.warning(f"⚠️ 检测到季度数据：从{before_filter}条记录过滤到{len(metrics)}条年度记录（只保留end_date以1231结尾的数据）")
     
     with st.expander("📋 详细财务数据表", expanded=False):
-        display_data = []
-        for idx, (_, row) in enumerate(metrics.iterrows()):
-            checks = evaluation['year_checks'][idx]
-            score = evaluation['scores'][idx]
-            
-            display_data.append({
-                "年份": row['end_date'][:4],
-                "资产负债率(%)": f"{row['debt_ratio']*100:.2f}" if pd.notna(row['debt_ratio']) else "-",
-                "负债率PASS": "✅" if checks['debt_ratio_pass'] else "❌",
-                "毛利率(%)": f"{row['gross_margin']*100:.2f}" if pd.notna(row['gross_margin']) else "-",
-                "毛利率PASS": "✅" if checks['gross_margin_pass'] else "❌",
-                "经营净现金流": f"{row['n_cashflow_act']:,.2f}" if pd.notna(row['n_cashflow_act']) else "-",
-                "经营净现金流>0": "✅" if checks['ocf_positive'] else "❌",
-                "净利润": f"{row['n_income']:,.2f}" if pd.notna(row['n_income']) else "-",
-                "OCF≥净利润": "✅" if checks['ocf_ge_profit'] else "❌",
-                "年度得分": score
-            })
-        
-        df_display = pd.DataFrame(display_data)
+        # 列式一次性构建展示表：字符串格式化和PASS图标全部向量化，
+        # 不再逐行iterrows+f-string拼dict
+        m = metrics.reset_index(drop=True)
+        checks_df = pd.DataFrame(evaluation['year_checks']).iloc[:len(m)].reset_index(drop=True)
+
+        df_display = pd.DataFrame({
+            "年份": m['end_date'].str[:4],
+            "资产负债率(%)": format_percentage_series(m['debt_ratio'], suffix=""),
+            "负债率PASS": np.where(checks_df['debt_ratio_pass'], '✅', '❌'),
+            "毛利率(%)": format_percentage_series(m['gross_margin'], suffix=""),
+            "毛利率PASS": np.where(checks_df['gross_margin_pass'], '✅', '❌'),
+            "经营净现金流": m['n_cashflow_act'].map('{:,.2f}'.format).where(m['n_cashflow_act'].notna(), '-'),
+            "经营净现金流>0": np.where(checks_df['ocf_positive'], '✅', '❌'),
+            "净利润": m['n_income'].map('{:,.2f}'.format).where(m['n_income'].notna(), '-'),
+            "OCF≥净利润": np.where(checks_df['ocf_ge_profit'], '✅', '❌'),
+            "年度得分": evaluation['scores'][:len(m)],
+        })
         st.dataframe(df_display, use_container_width=True, hide_index=True)
 
 
@@ -728,7 +1055,14 @@ def page_single_analysis():
             else:
                 ts_code = f"{ts_code}.SZ"
             st.info(f"📌 标准代码：**{ts_code}**")
-    
+
+    with col2:
+        force_refresh = st.checkbox(
+            "🔄 强制刷新",
+            value=False,
+            help="忽略本次会话已有的分析结果，重新拉取数据"
+        )
+
     if st.button("🔍 开始分析", type="primary", use_container_width=True):
         if not ts_code:
             st.error("请填写股票代码")
@@ -743,146 +1077,157 @@ def page_single_analysis():
         # 显示用户选择的范围（仅作展示）
         st.info(f"📅 分析年份范围：{st.session_state.start_year}年 - {st.session_state.end_year}年 (系统将自动获取该范围内所有可用数据)")
         
-        # 连通性检测
-        if st.session_state.debug_mode:
-            with st.spinner("正在进行连通性检测..."):
-                success, logs = run_connectivity_tests(verbose=False)
+        # 本次会话已分析过的相同查询直接复用，免去重复拉取与解析
+        result_key = f"single_result_{ts_code}_{fetch_start_date}_{fetch_end_date}"
+        result = None if force_refresh else st.session_state.get(result_key)
+        if result is None:
+            # 连通性检测
+            if st.session_state.debug_mode:
+                with st.spinner("正在进行连通性检测..."):
+                    success, logs = run_connectivity_tests(verbose=False)
             
-            with st.expander("🔌 连通性检测结果", expanded=not success):
-                for log in logs:
-                    if log["status"] == "PASS":
-                        st.success(f"✅ {log['title']}：{log['message']}")
-                    else:
-                        st.error(f"❌ {log['title']}：{log['message']}")
+                with st.expander("🔌 连通性检测结果", expanded=not success):
+                    for log in logs:
+                        if log["status"] == "PASS":
+                            st.success(f"✅ {log['title']}：{log['message']}")
+                        else:
+                            st.error(f"❌ {log['title']}：{log['message']}")
             
-            if not success:
-                st.warning("连通性检测未全部通过，但继续尝试分析...")
+                if not success:
+                    st.warning("连通性检测未全部通过，但继续尝试分析...")
         
-        # 数据分析（带持久化缓存）
-        # 显示缓存状态
-        if st.session_state.debug_mode:
-            cache_info = data_cache.get_cache_info()
-            st.info(f"🔍 缓存统计：有效 {cache_info['valid']} 个 | 过期 {cache_info['expired']} 个 | 总大小 {cache_info['size_mb']} MB")
+            # 数据分析（带持久化缓存）
+            # 显示缓存状态
+            if st.session_state.debug_mode:
+                cache_info = _cached_cache_info()
+                st.info(f"🔍 缓存统计：有效 {cache_info['valid']} 个 | 过期 {cache_info['expired']} 个 | 总大小 {cache_info['size_mb']} MB")
         
-        # 显示即将调用的API次数和预计时间
-        total_time = st.session_state.api_delay * 4  # 4个延迟间隔（5次调用）
-        st.info(f"💡 查询设置：延迟{st.session_state.api_delay}秒/次 | 预计耗时{total_time}秒 | 如有缓存则0秒返回")
-        st.caption("💡 包含：公司信息+审计意见+资产负债表+利润表+现金流量表")
+            # 显示即将调用的API次数和预计时间
+            total_time = st.session_state.api_delay * 4  # 4个延迟间隔（5次调用）
+            st.info(f"💡 查询设置：延迟{st.session_state.api_delay}秒/次 | 预计耗时{total_time}秒 | 如有缓存则0秒返回")
+            st.caption("💡 包含：公司信息+审计意见+资产负债表+利润表+现金流量表")
         
-        # 创建进度条
-        progress_bar = st.progress(0)
-        status_text = st.empty()
+            # 创建进度条
+            progress_bar = st.progress(0)
+            status_text = st.empty()
         
-        def update_progress(message, value):
-            """更新进度"""
-            status_text.text(message)
-            progress_bar.progress(value)
+            def update_progress(message, value):
+                """更新进度"""
+                status_text.text(message)
+                progress_bar.progress(value)
         
-        try:
-            # 从session_state获取积分信息（避免重复调用API）
-            user_points = None
-            if 'user_points_info' in st.session_state and st.session_state.user_points_info:
-                user_points = st.session_state.user_points_info.get('total_points', 2000)
+            try:
+                # 从session_state获取积分信息（避免重复调用API）
+                user_points = None
+                if 'user_points_info' in st.session_state and st.session_state.user_points_info:
+                    user_points = st.session_state.user_points_info.get('total_points', 2000)
             
-            result = analyze_fundamentals(
-                ts_code, fetch_start_date, fetch_end_date, 
-                use_cache=False,  # 单项分析强制禁用缓存，确保获取最新数据，避免缓存导致的逻辑冲突
-                api_delay=st.session_state.api_delay,
-                progress_callback=update_progress,
-                user_points=user_points  # 传入积分信息，避免重复调用API
-            )
-            progress_bar.empty()
-            status_text.empty()
+                result = analyze_fundamentals(
+                    ts_code, fetch_start_date, fetch_end_date, 
+                    use_cache=False,  # 单项分析强制禁用缓存，确保获取最新数据，避免缓存导致的逻辑冲突
+                    api_delay=st.session_state.api_delay,
+                    progress_callback=update_progress,
+                    user_points=user_points  # 传入积分信息，避免重复调用API
+                )
+                progress_bar.empty()
+                status_text.empty()
             
-            # 检查是否使用了缓存（通过判断耗时）
-            # 如果result中包含缓存标记更好，但这里简化处理
-            st.success("✅ 数据获取成功！")
-        except Exception as exc:
-            error_msg = str(exc)
-            st.error(f"❌ 分析失败：{error_msg}")
+                # 检查是否使用了缓存（通过判断耗时）
+                # 如果result中包含缓存标记更好，但这里简化处理
+                st.success("✅ 数据获取成功！")
+                # 存入会话缓存，后续交互复用，不再重复拉取
+                st.session_state[result_key] = result
+            except Exception as exc:
+                error_msg = str(exc)
+                st.error(f"❌ 分析失败：{error_msg}")
             
-            # 判断错误类型并给出建议
-            if "超限" in error_msg or "超过" in error_msg or "限制" in error_msg:
-                st.error("### 🚫 Tushare API 访问限制")
+                # 判断错误类型并给出建议
+                if "超限" in error_msg or "超过" in error_msg or "限制" in error_msg:
+                    st.error("### 🚫 Tushare API 访问限制")
                 
-                st.markdown(f"""
-**错误信息：** `{error_msg}`
-
-**问题分析：**
-- 每次查询消耗：**4次** API调用（审计+资产负债表+利润表+现金流量表）
-- 限制规则：根据您的积分等级，有不同的频率限制
-
-**Tushare 用户等级：**
-
-| 积分 | 等级 | 每分钟限制 | 每天限制 |
-|-----|------|----------|---------|
-| 0-119 | 未认证 | 2次 | 200次 |
-| 120-599 | 注册用户 | 5次 | 500次 |
-| 600-4999 | 中级用户 | 20次 | 2000次 |
-| 5000+ | 高级用户 | 200次 | 20000次 |
-
-**请检查您的实际积分：**
-1. 访问 https://tushare.pro/user/token
-2. 查看您的积分数和权限等级
-3. 如果积分充足但仍超限，可能是：
-   - 在1分钟内查询了太多股票
-   - 今日调用总次数已达上限
-   - 某些财务接口有特殊限制
-
-**立即解决：**
-- ⏰ **等待1-2分钟后重试**
-- 📦 使用缓存：查询过的股票会自动缓存，不消耗API
-- 🎯 减少查询频率：先分析完一个，再查下一个
-
-**系统优化：**
-- ✅ 已添加智能缓存，重复查询不调用API
-- ✅ 会显示API调用次数提醒
-- ✅ 建议开启调试模式查看详细信息
-                """)
+                    st.markdown(f"""
+    **错误信息：** `{error_msg}`
+
+    **问题分析：**
+    - 每次查询消耗：**4次** API调用（审计+资产负债表+利润表+现金流量表）
+    - 限制规则：根据您的积分等级，有不同的频率限制
+
+    **Tushare 用户等级：**
+
+    | 积分 | 等级 | 每分钟限制 | 每天限制 |
+    |-----|------|----------|---------|
+    | 0-119 | 未认证 | 2次 | 200次 |
+    | 120-599 | 注册用户 | 5次 | 500次 |
+    | 600-4999 | 中级用户 | 20次 | 2000次 |
+    | 5000+ | 高级用户 | 200次 | 20000次 |
+
+    **请检查您的实际积分：**
+    1. 访问 https://tushare.pro/user/token
+    2. 查看您的积分数和权限等级
+    3. 如果积分充足但仍超限，可能是：
+       - 在1分钟内查询了太多股票
+       - 今日调用总次数已达上限
+       - 某些财务接口有特殊限制
+
+    **立即解决：**
+    - ⏰ **等待1-2分钟后重试**
+    - 📦 使用缓存：查询过的股票会自动缓存，不消耗API
+    - 🎯 减少查询频率：先分析完一个，再查下一个
+
+    **系统优化：**
+    - ✅ 已添加智能缓存，重复查询不调用API
+    - ✅ 会显示API调用次数提醒
+    - ✅ 建议开启调试模式查看详细信息
+                    """)
                 
-                # 添加清除缓存按钮
-                col1, col2 = st.columns(2)
-                if col1.button("🗑️ 清除所有缓存"):
-                    count = data_cache.clear_all()
-                    st.success(f"已清除 {count} 个缓存文件")
-                    st.rerun()
-                if col2.button("🧹 清理过期缓存"):
-                    count = data_cache.clear_expired()
-                    st.success(f"已清理 {count} 个过期缓存")
-                    st.rerun()
-            elif "代码" in error_msg or "code" in error_msg.lower():
-                st.warning("""
-### ⚠️ 股票代码错误
-
-**可能原因：**
-- 股票代码输入错误
-- 该股票不存在或已退市
-- 代码格式不正确
-
-**建议：**
-- 检查股票代码是否正确（如：600519.SH）
-- 确认该股票是否还在交易
-- 尝试其他股票代码
-                """)
-            else:
-                st.warning("""
-### ⚠️ 数据获取失败
-
-**可能原因：**
-- 网络连接问题
-- Tushare 服务器暂时不可用
-- 该股票数据缺失
-
-**建议：**
-- 检查网络连接
-- 稍后重试
-- 尝试其他股票或调整年份范围
-                """)
+                    # 添加清除缓存按钮
+                    col1, col2 = st.columns(2)
+                    if col1.button("🗑️ 清除所有缓存"):
+                        count = data_cache.clear_all()
+                        _cached_cache_info.clear()
+                        st.success(f"已清除 {count} 个缓存文件")
+                        st.rerun()
+                    if col2.button("🧹 清理过期缓存"):
+                        count = data_cache.clear_expired()
+                        _cached_cache_info.clear()
+                        st.success(f"已清理 {count} 个过期缓存")
+                        st.rerun()
+                elif "代码" in error_msg or "code" in error_msg.lower():
+                    st.warning("""
+    ### ⚠️ 股票代码错误
+
+    **可能原因：**
+    - 股票代码输入错误
+    - 该股票不存在或已退市
+    - 代码格式不正确
+
+    **建议：**
+    - 检查股票代码是否正确（如：600519.SH）
+    - 确认该股票是否还在交易
+    - 尝试其他股票代码
+                    """)
+                else:
+                    st.warning("""
+    ### ⚠️ 数据获取失败
+
+    **可能原因：**
+    - 网络连接问题
+    - Tushare 服务器暂时不可用
+    - 该股票数据缺失
+
+    **建议：**
+    - 检查网络连接
+    - 稍后重试
+    - 尝试其他股票或调整年份范围
+                    """)
             
-            if st.session_state.debug_mode:
-                with st.expander("🔧 详细错误信息", expanded=False):
-                    st.exception(exc)
-            return
+                if st.session_state.debug_mode:
+                    with st.expander("🔧 详细错误信息", expanded=False):
+                        st.exception(exc)
+                return
+        else:
+            st.success("✅ 已复用本次会话的分析结果（如需重新拉取请勾选“强制刷新”）")
+
         
         company_info = result.get("company_info", None)
         audit_records = result.get("audit_records", [])
@@ -915,11 +1260,11 @@ def page_single_analysis():
                 if user_start_year <= int(str(rec.end_date)[:4]) <= user_end_year
             ]
         
-        # 调试信息：显示实际获取到的数据年份
-        if metrics is not None and not metrics.empty:
-            actual_years = sorted([row['end_date'][:4] for _, row in metrics.iterrows()])
-            if st.session_state.debug_mode:
-                st.info(f"🔍 调试信息：实际获取到 {len(metrics)} 年数据，年份：{', '.join(actual_years)}")
+        # 调试信息：显示实际获取到的数据年份（整列切片取年份，
+        # 且只在调试模式下才构建，非调试路径零开销）
+        if metrics is not None and not metrics.empty and st.session_state.debug_mode:
+            actual_years = sorted(metrics['end_date'].astype(str).str[:4].tolist())
+            st.info(f"🔍 调试信息：实际获取到 {len(metrics)} 年数据，年份：{', '.join(actual_years)}")
         
         # 检查是否有数据
         if metrics is None or metrics.empty:
@@ -941,7 +1286,7 @@ def page_single_analysis():
         sector_rules = SECTOR_RULES[st.session_state.selected_sector]
         
         # 评估得分
-        evaluation = evaluate_metrics(metrics, sector_rules, st.session_state.ocf_consecutive_years)
+        evaluation = evaluate_metrics_cached(metrics, sector_rules, st.session_state.ocf_consecutive_years)
         
         # 显示公司基本信息
         if company_info:
@@ -999,7 +1344,7 @@ def page_single_analysis():
             if before_filter != len(metrics):
                 st.warning(f"⚠️ 检测到季度数据：从{before_filter}条记录过滤到{len(metrics)}条年度记录（只保留end_date以1231结尾的数据）")
                 # 重新评估（因为数据量变了）
-                evaluation = evaluate_metrics(metrics, sector_rules, st.session_state.ocf_consecutive_years)
+                evaluation = evaluate_metrics_cached(metrics, sector_rules, st.session_state.ocf_consecutive_years)
         
         # 2. 三大核心指标
         render_core_indicators(metrics, evaluation, sector_rules)
@@ -1010,7 +1355,7 @@ def page_single_analysis():
         render_year_health_table(metrics, evaluation, sector_rules)
         
         # 图表
-        render_health_charts(metrics)
+        render_health_charts(metrics, evaluation)
         
         # 详细数据表
         render_detailed_table(metrics, evaluation)
@@ -1052,49 +1397,32 @@ def page_single_analysis():
         
         if ocf_info['consecutive_ok'] and cash_quality >= 0.8:
             st.success("**结论：真金白银，赚到手了！** ✅")
-            st.markdown(f"""
-**现金流表现：**
-- ✅ 连续 **{ocf_info['max_consecutive']}年** 收到真实现金
-- ✅ 近{total_years}年中有 **{ocf_info['ge_profit_count']}年** 现金流≥账面利润（占比{cash_quality*100:.0f}%）
-- ✅ 赚的是实实在在的钱，不是"账面富翁"
+            st.markdown(_OCF_TMPL_EXCELLENT.format(
+                max_consecutive=ocf_info['max_consecutive'],
+                total_years=total_years,
+                ge_profit_count=ocf_info['ge_profit_count'],
+                cash_quality_pct=cash_quality * 100
+            ))
 
-**通俗解读：** 就像做生意，不仅账本上有利润，钱也真的收回来了。这种公司才是真赚钱！
-            """)
-            
         elif ocf_info['consecutive_ok']:
             st.info("**结论：基本赚钱，但要注意收款** 🟡")
-            st.markdown(f"""
-**现金流表现：**
-- ✅ 连续 **{ocf_info['max_consecutive']}年** 有现金流入
-- ⚠️ 但有 **{total_years - ocf_info['ge_profit_count']}年** 收到的钱少于账面利润
-- ⚠️ 部分利润可能还在客户那里（应收账款）
+            st.markdown(_OCF_TMPL_GOOD.format(
+                max_consecutive=ocf_info['max_consecutive'],
+                not_ge_years=total_years - ocf_info['ge_profit_count']
+            ))
 
-**通俗解读：** 生意是赚钱的，但有些钱还没收回来，要注意是否能收回。
-            """)
-            
         elif ocf_info['max_consecutive'] >= 2:
             st.warning("**结论：收款能力不稳定** ⚠️")
-            st.markdown(f"""
-**现金流表现：**
-- ⚠️ 最长连续 **{ocf_info['max_consecutive']}年** 有现金（标准要求≥{st.session_state.ocf_consecutive_years}年）
-- ⚠️ 现金流断断续续，不够稳定
-- ⚠️ 有些年份钱收不回来
+            st.markdown(_OCF_TMPL_UNSTABLE.format(
+                max_consecutive=ocf_info['max_consecutive'],
+                required_years=st.session_state.ocf_consecutive_years
+            ))
 
-**通俗解读：** 像做生意时好时坏，今年赚了钱收回来，明年又收不回。这种不稳定性需要警惕。
-            """)
-            
         else:
             st.error("**结论：可能是纸上富贵** 🚨")
-            st.markdown(f"""
-**现金流表现：**
-- ❌ 最长只连续 **{ocf_info['max_consecutive']}年** 有现金
-- ❌ 现金流很不稳定
-- ❌ 账面有利润，但钱大多没收回来
-
-**通俗解读：** 就像欠条一大堆，看着账面有钱，实际钱包空空。这种公司风险很高！
-
-**投资建议：** 强烈建议回避
-            """)
+            st.markdown(_OCF_TMPL_POOR.format(
+                max_consecutive=ocf_info['max_consecutive']
+            ))
         
         # 保存历史
         HistoryManager.add_record({
@@ -1109,6 +1437,155 @@ def page_single_analysis():
         })
 
 
+def _to_roe_decimal(roe_raw):
+    """ROE原始值换算为小数（绝对值>1视为百分数），无法解析时返回None"""
+    if roe_raw is None or (isinstance(roe_raw, (int, float)) and pd.isna(roe_raw)):
+        return None
+    try:
+        roe_val = float(roe_raw)
+    except (TypeError, ValueError):
+        return None
+    return roe_val / 100 if abs(roe_val) > 1 else roe_val
+
+
+def _pr_display_ctx(val_data: "ValuationSnapshot", result: dict) -> dict:
+    """
+    一次性准备市赚率计算过程展示用的格式化字符串
+
+    个股与指数分支共用同一换算路径，避免两处各自维护ROE换算逻辑
+    """
+    roe_raw = val_data.roe_waa
+    return {
+        'pe_text': format_metric_value(val_data.pe_ttm),
+        'roe_pct_text': format_metric_value(roe_raw, suffix="%"),
+        'roe_decimal_text': format_metric_value(_to_roe_decimal(roe_raw), ".4f"),
+        'n_text': format_metric_value(result.get('correction_factor'), '.3f'),
+    }
+
+
+def _render_buffett_sell_column(buffett_sell_pr):
+    """巴菲特卖标普指标列（个股与指数分支共用）"""
+    st.markdown("### 🏛️ 巴菲特卖标普指标（系数150）")
+    st.markdown("*判断整个市场是否太贵*")
+    st.metric("PR值", format_metric_value(buffett_sell_pr, ".4f", "", "N/A"))
+    if buffett_sell_pr is not None:
+        if buffett_sell_pr > 1.5:
+            st.error("⚠️ PR > 1.5，整个市场太贵了，建议清仓")
+        elif buffett_sell_pr > 1.0:
+            st.warning("⚠️ PR > 1.0，市场偏高，考虑减仓")
+        else:
+            st.success("✅ PR ≤ 1.0，市场估值合理")
+    st.caption("公式：PR = PE / ROE / 150")
+
+
+def _render_buffett_buy_column(buffett_buy_pr):
+    """巴菲特购买股票指标列（个股与指数分支共用）"""
+    st.markdown("### 💰 巴菲特购买股票指标（系数100）")
+    st.markdown("*判断个股是否值得买入*")
+    st.metric("PR值", format_metric_value(buffett_buy_pr, ".4f", "", "N/A"))
+    if buffett_buy_pr is not None:
+        if buffett_buy_pr < 0.4:
+            st.success("✅ PR < 0.4，严重低估（用40美分买1美元资产），强烈买入")
+        elif buffett_buy_pr < 0.6:
+            st.info("💡 PR 0.4-0.6，低估（用50-60美分买1美元资产），可买入")
+        elif buffett_buy_pr < 1.0:
+            st.info("💡 PR 0.6-1.0，合理估值，可持有")
+        else:
+            st.warning("⚠️ PR > 1.0，可能高估，建议卖出或持有")
+    st.caption("公式：PR = PE / ROE / 100")
+
+
+def _render_price_anchors(val_data: "ValuationSnapshot"):
+    """逆向推导价格锚点（仅个股）：按目标PR推算买卖价位并标注涨跌空间"""
+    current_price = val_data.close
+    if current_price is None:
+        return
+    st.markdown("#### 📊 逆向推导：价格锚点")
+    for emoji, label, target_pr in (
+        ("📈", "卖出警戒价", 1.0),
+        ("🚀", "清仓价", 1.5),
+        ("📉", "强烈买入价", 0.4),
+    ):
+        price = PRValuation.calculate_price_for_pr(target_pr, val_data.roe_waa, val_data.eps, 100)
+        if price is None:
+            continue
+        diff = (price - current_price) / current_price * 100
+        color = "red" if diff < 0 else "green"
+        direction = "需跌" if diff < 0 else "需涨"
+        st.markdown(f"{emoji} **{label} (PR={target_pr})：** `{price:.2f}元` (当前 `{current_price}元`, {direction} :{color}[{abs(diff):.1f}%])")
+
+
+def _render_buffett_block(pe_ttm, roe_waa, val_data: Optional["ValuationSnapshot"] = None):
+    """
+    巴菲特估值指标区（个股与指数分支共用）
+
+    两个分支此前各自维护一份相同的双列布局，现统一在此渲染；
+    个股分支传入val_data，右列会附加逆向推导的价格锚点。
+    """
+    buffett_sell_pr = PRValuation.calculate_buffett_sell_pr(pe_ttm, roe_waa)
+    buffett_buy_pr = PRValuation.calculate_buffett_buy_pr(pe_ttm, roe_waa)
+
+    st.divider()
+    st.subheader("📊 巴菲特估值指标")
+    col1, col2 = st.columns(2)
+
+    with col1:
+        _render_buffett_sell_column(buffett_sell_pr)
+        if val_data is not None:
+            # 左侧不再显示个股的逆向推导，统一移至右侧
+            st.caption("💡 个股的买卖价格推导请看右侧 👉")
+
+    with col2:
+        _render_buffett_buy_column(buffett_buy_pr)
+        if val_data is not None:
+            # 逆向推导：买入 & 卖出价格 (统一使用系数100)
+            _render_price_anchors(val_data)
+
+
+@st.cache_resource
+def _threshold_fig_template():
+    """
+    市赚率阈值对照图的静态模板（进程内共建一次）
+
+    标题、轴标签等布局与每次分析无关，用st.cache_resource只构建一次；
+    每次渲染时浅拷贝后整体替换layout.shapes/annotations并补上当前PR散点，
+    避免反复add_hline逐条重建形状列表。
+    """
+    fig = go.Figure()
+    fig.update_layout(
+        title="市赚率水平对照",
+        yaxis_title="PR值",
+        height=400,
+        showlegend=True
+    )
+    return fig
+
+
+def _build_threshold_fig(signal: dict) -> go.Figure:
+    """基于模板组装阈值对照图：三条阈值线 + 当前PR散点"""
+    fig = copy.copy(_threshold_fig_template())
+    thresholds = [
+        (signal['buy_threshold'], 'green', '买入阈值'),
+        (signal['sell_start'], 'orange', '卖出阈值'),
+        (signal['sell_all'], 'red', '清仓阈值'),
+    ]
+    # 直接整体赋值shapes/annotations（add_hline每次都会重建整个形状列表）
+    fig.layout.shapes = [
+        dict(type='line', xref='paper', x0=0, x1=1, y0=value, y1=value,
+             line=dict(dash='dash', color=color))
+        for value, color, _ in thresholds
+    ]
+    fig.layout.annotations = [
+        dict(xref='paper', x=1, y=value, yanchor='bottom', showarrow=False,
+             text=f"{label} {value:.2f}")
+        for value, _, label in thresholds
+    ]
+    fig.add_scatter(x=["当前PR"], y=[signal['pr_value']],
+                    mode='markers', marker=dict(size=20, color='blue'),
+                    name="当前市赚率")
+    return fig
+
+
 def page_pr_valuation():
     """
     市赚率估值分析页面
@@ -1187,7 +1664,7 @@ def page_pr_valuation():
         # 获取估值数据
         try:
             with st.spinner(f"正在获取 {ts_code} 在 {trade_date_str} 的估值数据..."):
-                val_data = fetch_valuation_data(ts_code, trade_date_str, target_type)
+                val_data = _cached_valuation(ts_code, trade_date_str, target_type)
             
             if val_data is None:
                 st.error("❌ 未获取到估值数据")
@@ -1206,18 +1683,19 @@ def page_pr_valuation():
             # 显示原始数据
             st.subheader("📊 基础数据")
             col1, col2, col3, col4, col5 = st.columns(5)
-            col1.metric("收盘价", format_metric_value(val_data.get('close'), suffix="元"))
-            col2.metric("市盈率TTM", format_metric_value(val_data.get('pe_ttm')))
-            col3.metric("加权ROE", format_metric_value(val_data.get('roe_waa'), suffix="%"))
-            col4.metric("每股收益", format_metric_value(val_data.get('eps'), suffix="元"))
-            col5.metric("每股股息", format_metric_value(val_data.get('dividend_per_share'), suffix="元"))
+            v = fmt_all(val_data, ['close', 'pe_ttm', 'roe_waa', 'eps', 'dividend_per_share'])
+            col1.metric("收盘价", v.close)
+            col2.metric("市盈率TTM", v.pe_ttm)
+            col3.metric("加权ROE", v.roe_waa)
+            col4.metric("每股收益", v.eps)
+            col5.metric("每股股息", v.dividend_per_share)
             
             missing_metrics = []
-            if val_data.get('pe_ttm') is None:
+            if val_data.pe_ttm is None:
                 missing_metrics.append("市盈率TTM（pe_ttm）")
-            if target_type == "个股" and val_data.get('roe_waa') is None:
+            if target_type == "个股" and val_data.roe_waa is None:
                 missing_metrics.append("加权ROE（roe_waa）")
-            if target_type == "个股" and val_data.get('eps') is None:
+            if target_type == "个股" and val_data.eps is None:
                 missing_metrics.append("每股收益（eps）")
             
             if missing_metrics:
@@ -1228,7 +1706,7 @@ def page_pr_valuation():
             # 计算市赚率
             if target_type == "个股":
                 # 个股估值分析
-                result = PRValuation.analyze_stock_valuation(val_data)
+                result = analyze_stock_valuation_cached(val_data)
                 
                 st.subheader("💎 个股估值分析")
                 
@@ -1236,8 +1714,8 @@ def page_pr_valuation():
                 with st.expander("📐 计算过程详解", expanded=True):
                     st.markdown("### 第1步：计算股息支付率")
                     payout_ratio = result.get('payout_ratio')
-                    dividend_val = val_data.get('dividend_per_share')
-                    eps_val = val_data.get('eps')
+                    dividend_val = val_data.dividend_per_share
+                    eps_val = val_data.eps
                     if dividend_val is None:
                         st.info("提示：最近披露的分红记录中未找到每股股息，可能未分红或尚未披露。")
                     else:
@@ -1267,21 +1745,12 @@ def page_pr_valuation():
                     
                     st.markdown("### 第3步：计算修正市赚率")
                     st.latex(r"\text{修正PR} = N \times \frac{\text{PE}_{\text{TTM}}}{\text{ROE（小数）}} \div 150")
-                    pe_text = format_metric_value(val_data.get('pe_ttm'))
-                    roe_raw = val_data.get('roe_waa')
-                    if roe_raw is None or (isinstance(roe_raw, (int, float)) and pd.isna(roe_raw)):
-                        roe_decimal = None
-                    else:
-                        try:
-                            roe_val = float(roe_raw)
-                            roe_decimal = roe_val / 100 if abs(roe_val) > 1 else roe_val
-                        except (TypeError, ValueError):
-                            roe_decimal = None
-                    roe_text = format_metric_value(val_data.get('roe_waa'), suffix="%")
-                    roe_decimal_text = format_metric_value(roe_decimal, ".4f")
-                    st.caption(f"ROE原始值：{roe_text} → 换算为小数：{roe_decimal_text}")
+                    ctx = _pr_display_ctx(val_data, result)
+                    pe_text = ctx['pe_text']
+                    roe_decimal_text = ctx['roe_decimal_text']
+                    st.caption(f"ROE原始值：{ctx['roe_pct_text']} → 换算为小数：{roe_decimal_text}")
                     st.markdown(
-                        f"= {format_metric_value(result.get('correction_factor'), '.3f')} × {pe_text} / {roe_decimal_text} / 150"
+                        f"= {ctx['n_text']} × {pe_text} / {roe_decimal_text} / 150"
                     )
                     if result['corrected_pr'] is not None:
                         st.success(f"**= {format_metric_value(result['corrected_pr'], '.4f', '')}**")
@@ -1298,7 +1767,7 @@ def page_pr_valuation():
 {f"= {format_metric_value(standard_pr_val, '.4f', '')}" if standard_pr_val is not None else "= 无法计算（缺少PE或ROE）"}
                         
 **修正市赚率（PR_corrected）**  
-= {format_metric_value(result.get('correction_factor'), '.3f')} × {pe_text} / {roe_decimal_text} / 150  
+= {ctx['n_text']} × {pe_text} / {roe_decimal_text} / 150  
 {f"= {format_metric_value(corrected_pr_val, '.4f', '')}" if corrected_pr_val is not None else "= 无法计算（缺少PE或ROE）"}
                         """
                     )
@@ -1309,84 +1778,8 @@ def page_pr_valuation():
                 col2.metric("修正市赚率", format_metric_value(result.get('corrected_pr'), ".4f", "", "N/A"))
                 col3.metric("股息支付率", format_metric_value(result.get('payout_ratio'), ".2f", "%", "N/A"))
                 
-                # 计算并显示巴菲特指标
-                pe_ttm = val_data.get('pe_ttm')
-                roe_waa = val_data.get('roe_waa')
-                buffett_sell_pr = PRValuation.calculate_buffett_sell_pr(pe_ttm, roe_waa)
-                buffett_buy_pr = PRValuation.calculate_buffett_buy_pr(pe_ttm, roe_waa)
-                
-                st.divider()
-                st.subheader("📊 巴菲特估值指标")
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown("### 🏛️ 巴菲特卖标普指标（系数150）")
-                    st.markdown("*判断整个市场是否太贵*")
-                    buffett_sell_display = format_metric_value(buffett_sell_pr, ".4f", "", "N/A")
-                    st.metric("PR值", buffett_sell_display)
-                    if buffett_sell_pr is not None:
-                        if buffett_sell_pr > 1.5:
-                            st.error("⚠️ PR > 1.5，整个市场太贵了，建议清仓")
-                        elif buffett_sell_pr > 1.0:
-                            st.warning("⚠️ PR > 1.0，市场偏高，考虑减仓")
-                        else:
-                            st.success("✅ PR ≤ 1.0，市场估值合理")
-                    st.caption("公式：PR = PE / ROE / 150")
-                    
-                    # 左侧不再显示个股的逆向推导，统一移至右侧
-                    if target_type == "个股":
-                        st.caption("💡 个股的买卖价格推导请看右侧 👉")
-                
-                with col2:
-                    st.markdown("### 💰 巴菲特购买股票指标（系数100）")
-                    st.markdown("*判断个股是否值得买入*")
-                    buffett_buy_display = format_metric_value(buffett_buy_pr, ".4f", "", "N/A")
-                    st.metric("PR值", buffett_buy_display)
-                    if buffett_buy_pr is not None:
-                        if buffett_buy_pr < 0.4:
-                            st.success("✅ PR < 0.4，严重低估（用40美分买1美元资产），强烈买入")
-                        elif buffett_buy_pr < 0.6:
-                            st.info("💡 PR 0.4-0.6，低估（用50-60美分买1美元资产），可买入")
-                        elif buffett_buy_pr < 1.0:
-                            st.info("💡 PR 0.6-1.0，合理估值，可持有")
-                        else:
-                            st.warning("⚠️ PR > 1.0，可能高估，建议卖出或持有")
-                    st.caption("公式：PR = PE / ROE / 100")
-                    
-                    # 逆向推导：买入 & 卖出价格 (统一使用系数100)
-                    if target_type == "个股":
-                        eps_val = val_data.get('eps')
-                        roe_val = val_data.get('roe_waa')
-                        current_price = val_data.get('close')
-                        
-                        # 计算各个阈值的价格 (Coeff 100)
-                        price_buy_strong = PRValuation.calculate_price_for_pr(0.4, roe_val, eps_val, 100)
-                        price_sell_alert = PRValuation.calculate_price_for_pr(1.0, roe_val, eps_val, 100)
-                        price_sell_clear = PRValuation.calculate_price_for_pr(1.5, roe_val, eps_val, 100)
-                        
-                        if current_price is not None:
-                            st.markdown("#### 📊 逆向推导：价格锚点")
-                            
-                            # 1. 卖出警戒 (PR=1.0)
-                            if price_sell_alert is not None:
-                                diff = (price_sell_alert - current_price) / current_price * 100
-                                color = "red" if diff < 0 else "green"
-                                direction = "需跌" if diff < 0 else "需涨"
-                                st.markdown(f"📈 **卖出警戒价 (PR=1.0)：** `{price_sell_alert:.2f}元` (当前 `{current_price}元`, {direction} :{color}[{abs(diff):.1f}%])")
-                            
-                            # 2. 清仓价 (PR=1.5)
-                            if price_sell_clear is not None:
-                                diff = (price_sell_clear - current_price) / current_price * 100
-                                color = "red" if diff < 0 else "green"
-                                direction = "需跌" if diff < 0 else "需涨"
-                                st.markdown(f"🚀 **清仓价 (PR=1.5)：** `{price_sell_clear:.2f}元` (当前 `{current_price}元`, {direction} :{color}[{abs(diff):.1f}%])")
-                                
-                            # 3. 强烈买入 (PR=0.4)
-                            if price_buy_strong is not None:
-                                diff = (price_buy_strong - current_price) / current_price * 100
-                                color = "red" if diff < 0 else "green"
-                                direction = "需跌" if diff < 0 else "需涨"
-                                st.markdown(f"📉 **强烈买入价 (PR=0.4)：** `{price_buy_strong:.2f}元` (当前 `{current_price}元`, {direction} :{color}[{abs(diff):.1f}%])")
+                # 计算并显示巴菲特指标（含右列的价格锚点推导）
+                _render_buffett_block(val_data.pe_ttm, val_data.roe_waa, val_data)
                 
             else:
                 # 指数估值分析
@@ -1404,20 +1797,11 @@ def page_pr_valuation():
                 with st.expander("📐 计算过程详解", expanded=True):
                     st.markdown("### 宽基指数市赚率公式")
                     st.latex(r"\text{宽基PR} = \frac{\text{PE}_{\text{TTM}}}{\text{ROE（小数）}} \div 150")
-                    index_roe_raw = val_data.get('roe_waa')
-                    if index_roe_raw is None or (isinstance(index_roe_raw, (int, float)) and pd.isna(index_roe_raw)):
-                        index_roe_decimal = None
-                    else:
-                        try:
-                            roe_val = float(index_roe_raw)
-                            index_roe_decimal = roe_val / 100 if abs(roe_val) > 1 else roe_val
-                        except (TypeError, ValueError):
-                            index_roe_decimal = None
-                    index_roe_percent_text = format_metric_value(index_roe_raw, suffix="%")
-                    index_roe_decimal_text = format_metric_value(index_roe_decimal, ".4f")
-                    st.caption(f"ROE原始值：{index_roe_percent_text} → 换算为小数：{index_roe_decimal_text}")
+                    ctx = _pr_display_ctx(val_data, result)
+                    index_roe_decimal_text = ctx['roe_decimal_text']
+                    st.caption(f"ROE原始值：{ctx['roe_pct_text']} → 换算为小数：{index_roe_decimal_text}")
                     st.markdown(
-                        f"= {format_metric_value(val_data.get('pe_ttm'))} / {index_roe_decimal_text} / 150"
+                        f"= {ctx['pe_text']} / {index_roe_decimal_text} / 150"
                     )
                     if result['broad_pr'] is not None:
                         st.success(f"**= {format_metric_value(result['broad_pr'], '.4f', '')}**")
@@ -1432,7 +1816,7 @@ def page_pr_valuation():
                     st.markdown(
                         f"""
 **宽基市赚率（PR_broad）**  
-= {format_metric_value(val_data.get('pe_ttm'))} / {index_roe_decimal_text} / 150  
+= {ctx['pe_text']} / {index_roe_decimal_text} / 150  
 {f"= {format_metric_value(broad_pr_val, '.4f', '')}" if broad_pr_val is not None else "= 无法计算（缺少PE或ROE）"}
                         """
                     )
@@ -1446,44 +1830,7 @@ def page_pr_valuation():
                     col3.metric("当前PR", format_metric_value(result.get('broad_pr'), ".4f", "", "N/A"))
                 
                 # 计算并显示巴菲特指标（指数分析也显示）
-                index_pe_ttm = val_data.get('pe_ttm')
-                index_roe_waa = val_data.get('roe_waa')
-                index_buffett_sell_pr = PRValuation.calculate_buffett_sell_pr(index_pe_ttm, index_roe_waa)
-                index_buffett_buy_pr = PRValuation.calculate_buffett_buy_pr(index_pe_ttm, index_roe_waa)
-                
-                st.divider()
-                st.subheader("📊 巴菲特估值指标")
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown("### 🏛️ 巴菲特卖标普指标（系数150）")
-                    st.markdown("*判断整个市场是否太贵*")
-                    index_buffett_sell_display = format_metric_value(index_buffett_sell_pr, ".4f", "", "N/A")
-                    st.metric("PR值", index_buffett_sell_display)
-                    if index_buffett_sell_pr is not None:
-                        if index_buffett_sell_pr > 1.5:
-                            st.error("⚠️ PR > 1.5，整个市场太贵了，建议清仓")
-                        elif index_buffett_sell_pr > 1.0:
-                            st.warning("⚠️ PR > 1.0，市场偏高，考虑减仓")
-                        else:
-                            st.success("✅ PR ≤ 1.0，市场估值合理")
-                    st.caption("公式：PR = PE / ROE / 150")
-                
-                with col2:
-                    st.markdown("### 💰 巴菲特购买股票指标（系数100）")
-                    st.markdown("*判断个股是否值得买入*")
-                    index_buffett_buy_display = format_metric_value(index_buffett_buy_pr, ".4f", "", "N/A")
-                    st.metric("PR值", index_buffett_buy_display)
-                    if index_buffett_buy_pr is not None:
-                        if index_buffett_buy_pr < 0.4:
-                            st.success("✅ PR < 0.4，严重低估（用40美分买1美元资产），强烈买入")
-                        elif index_buffett_buy_pr < 0.6:
-                            st.info("💡 PR 0.4-0.6，低估（用50-60美分买1美元资产），可买入")
-                        elif index_buffett_buy_pr < 1.0:
-                            st.info("💡 PR 0.6-1.0，合理估值，可持有")
-                        else:
-                            st.warning("⚠️ PR > 1.0，可能高估，建议卖出或持有")
-                    st.caption("公式：PR = PE / ROE / 100")
+                _render_buffett_block(val_data.pe_ttm, val_data.roe_waa)
             
             st.divider()
             
@@ -1523,29 +1870,8 @@ def page_pr_valuation():
                     ])
                     st.dataframe(threshold_df, use_container_width=True, hide_index=True)
                 
-                # 可视化阈值
-                fig = go.Figure()
-                
-                # 添加阈值线
-                fig.add_hline(y=signal['buy_threshold'], line_dash="dash", line_color="green", 
-                             annotation_text=f"买入阈值 {signal['buy_threshold']:.2f}")
-                fig.add_hline(y=signal['sell_start'], line_dash="dash", line_color="orange", 
-                             annotation_text=f"卖出阈值 {signal['sell_start']:.2f}")
-                fig.add_hline(y=signal['sell_all'], line_dash="dash", line_color="red", 
-                             annotation_text=f"清仓阈值 {signal['sell_all']:.2f}")
-                
-                # 添加当前PR点
-                fig.add_scatter(x=["当前PR"], y=[signal['pr_value']], 
-                               mode='markers', marker=dict(size=20, color='blue'),
-                               name="当前市赚率")
-                
-                fig.update_layout(
-                    title="市赚率水平对照",
-                    yaxis_title="PR值",
-                    height=400,
-                    showlegend=True
-                )
-                
+                # 可视化阈值（布局模板缓存复用，每次只填阈值线和当前PR点）
+                fig = _build_threshold_fig(signal)
                 st.plotly_chart(fig, use_container_width=True)
             
             # ---------------------------------------------------------
@@ -1851,6 +2177,295 @@ def page_pr_valuation():
                 st.exception(e)
 
 
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_valuation(ts_code: str, trade_date_str: str, target_type: str):
+    """fetch_valuation_data的缓存包装：同一(代码, 日期)的重复查询直接命中内存"""
+    return fetch_valuation_data(ts_code, trade_date_str, target_type)
+
+
+@st.cache_resource
+def _get_screener() -> StockScreener:
+    """StockScreener单例：进程内只初始化一次tushare客户端，复用HTTP连接"""
+    return StockScreener()
+
+
+@st.cache_data(ttl=86400, show_spinner=False)
+def _cached_stock_list(exclude_st: bool = True):
+    """A股股票列表的缓存包装：列表每天变化极小，按天缓存"""
+    return _get_screener().get_a_stock_list(exclude_st=exclude_st)
+
+
+@st.cache_data(show_spinner=False)
+def _results_csv_bytes(df: pd.DataFrame) -> bytes:
+    """
+    筛选结果表的CSV字节串（按DataFrame内容缓存）
+
+    结果表已是pyarrow后端dtype，from_pandas近乎零拷贝拿到Arrow Table，
+    再由pyarrow.csv.write_csv在C层完成序列化（明显快于DataFrame.to_csv；
+    文本列会统一带引号，仍是标准CSV）。手工写入UTF-8 BOM保证Excel打开
+    不乱码；结果不变时rerun直接复用字节串
+    """
+    buf = io.BytesIO()
+    buf.write(b'\xef\xbb\xbf')
+    pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf)
+    return buf.getvalue()
+
+
+class ScreeningRecord(NamedTuple):
+    """
+    单只通过筛选股票的展示记录
+
+    入选时从详情字典拍平一次，之后排序和表格构建都走C层的
+    元组槽位访问，不再每行做多次dict哈希查找
+    """
+    ts_code: str
+    name: str
+    final_pr: Optional[float]
+    roe_waa: Optional[float]
+    pe_ttm: Optional[float]
+    audit_pass: bool
+    cashflow_pass: bool
+
+
+def _result_final_pr(stock: dict, default: float = float('inf')) -> float:
+    """
+    从筛选结果中取最终PR
+
+    check_valuation_pass的详情字典用中文键（'最终PR'），
+    兼容读取英文键以防旧会话中的历史结果；缺失时返回default
+    """
+    valuation = stock.get('valuation_details', {})
+    pr = valuation.get('最终PR')
+    if pr is None:
+        pr = valuation.get('final_pr')
+    return default if pr is None else pr
+
+
+def _screen_single_stock(screener, ts_code, stock_name, years, min_roe, max_pr,
+                         api_delay, user_points, api_semaphore, val_row=None):
+    """
+    筛选单只股票（线程池工作函数）
+
+    在工作线程中完成 深度分析 -> 基本面检查 -> 估值检查 三步，
+    API访问用信号量限流，不触碰任何st.*组件
+
+    返回:
+        (是否通过, 通过时的结果字典否则None, 本股耗时秒)
+    """
+    start_ts = time.time()
+
+    # 强制使用全量历史数据策略（1990-2999），
+    # 彻底解决因年报发布时间判断不准导致的数据不足问题
+    with api_semaphore:
+        result = analyze_fundamentals(
+            ts_code=ts_code,
+            start_date="19900101",
+            end_date="29991231",
+            years=years,  # 这个参数在指定日期范围时会被忽略
+            use_cache=True,
+            api_delay=api_delay,
+            max_workers=1,  # 单个任务内部仍是串行调用
+            user_points=user_points
+        )
+
+    if not result:
+        return False, None, time.time() - start_ts
+
+    audit_records = result.get('audit_records', [])
+    metrics = result.get('metrics')
+    if metrics is None or metrics.empty:
+        return False, None, time.time() - start_ts
+
+    # 基本面检查
+    fundamentals_pass, fundamentals_details = screener.check_fundamentals_pass(
+        audit_records=audit_records,
+        metrics=metrics,
+        required_years=years
+    )
+    if not fundamentals_pass:
+        return False, None, time.time() - start_ts
+
+    # 基本面通过，检查估值
+    with api_semaphore:
+        valuation_pass, valuation_details = screener.check_valuation_pass(
+            ts_code=ts_code,
+            pr_threshold=max_pr,
+            min_roe=min_roe,
+            val_row=val_row
+        )
+    if not valuation_pass:
+        return False, None, time.time() - start_ts
+
+    return True, {
+        'ts_code': ts_code,
+        'name': stock_name,
+        'fundamentals_details': fundamentals_details,
+        'valuation_details': valuation_details
+    }, time.time() - start_ts
+
+
+# 批量筛选时进度控件每N只股票刷新一次（摊薄前端消息推送开销）
+_PROGRESS_UPDATE_EVERY = 20
+
+# 每个script run提交给线程池的股票窗口大小：窗口间rerun一次，
+# 让停止按钮等交互有机会被处理，而不是整个市场一口气跑完才响应
+_SCREENING_WINDOW = 100
+
+
+def _render_screening_progress():
+    """
+    筛选进度面板
+
+    进度数据全部从session_state.screening_progress读取。
+    筛选按窗口分批跑，每个窗口结束的rerun都会重绘本面板；
+    窗口内的细粒度进度由处理循环里的placeholder原地刷新。
+    不用run_every定时fragment：窗口处理期间script线程被占用，
+    定时刷新根本执行不了，其rerun请求反而会打断处理循环。
+    """
+    progress = st.session_state.screening_progress
+    processed = progress['processed']
+    total = progress['total']
+    passed = progress['passed']
+    failed = progress['failed']
+    start_time = progress.get('start_time')
+    if start_time is None:
+        start_time = datetime.now().timestamp()
+        st.session_state.screening_progress['start_time'] = start_time
+
+    # 确保start_time是时间戳(float)
+    if isinstance(start_time, datetime):
+        start_time = start_time.timestamp()
+
+    time_records = progress.get('time_records', [])
+
+    # 计算时间信息
+    current_timestamp = datetime.now().timestamp()
+
+    # 优先使用累积耗时（更准确，不受start_time重置影响）
+    if time_records:
+        elapsed_time = sum(time_records)
+    else:
+        elapsed_time = current_timestamp - start_time
+
+    # 计算平均每只股票耗时
+    avg_time_per_stock = 0
+    if time_records:
+        # 优先使用记录的每只股票耗时计算平均值（更准确）
+        avg_time_per_stock = sum(time_records) / len(time_records)
+    elif processed > 0:
+        # 降级方案：使用总耗时/已处理数量
+        avg_time_per_stock = elapsed_time / processed
+
+    # 预估剩余时间
+    remaining_stocks = total - processed
+    estimated_remaining_time = 0
+    if processed > 0 and remaining_stocks > 0:
+        # 如果有平均时间，用平均时间；否则用当前速度
+        if avg_time_per_stock > 0:
+            estimated_remaining_time = avg_time_per_stock * remaining_stocks
+
+    # 格式化时间显示
+    def format_time(seconds):
+        """格式化时间显示"""
+        if seconds < 60:
+            return f"{int(seconds)}秒"
+        elif seconds < 3600:
+            minutes = int(seconds // 60)
+            secs = int(seconds % 60)
+            return f"{minutes}分{secs}秒"
+        else:
+            hours = int(seconds // 3600)
+            minutes = int((seconds % 3600) // 60)
+            secs = int(seconds % 60)
+            return f"{hours}小时{minutes}分{secs}秒"
+
+    # 美化UI：时间信息卡片
+    # 将时间戳转为datetime对象用于显示
+    start_dt = datetime.fromtimestamp(start_time)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("🕒 开始时间", start_dt.strftime('%H:%M:%S'))
+    with col2:
+        st.metric("⏱️ 已用时间", format_time(elapsed_time))
+    with col3:
+        if avg_time_per_stock > 0:
+            avg_text = f"{avg_time_per_stock:.2f}秒"
+        else:
+            avg_text = "计算中..."
+        st.metric("📊 平均运行", avg_text)
+    with col4:
+        # 剩余时间
+        if estimated_remaining_time > 0:
+            remaining_text = format_time(estimated_remaining_time)
+        elif processed > 0:
+            # 如果已经开始处理但还没算出剩余时间（极少情况）
+            remaining_text = "计算中..."
+        else:
+            remaining_text = "准备中..."
+        st.metric("⏳ 剩余时间", remaining_text)
+
+    # 美化UI：进度条和进度信息（使用卡片样式）
+    if total > 0:
+        progress_value = processed / total
+
+        # 进度卡片容器
+        st.markdown("---")
+        st.markdown("### 📊 筛选进度")
+
+        # 使用自定义样式美化进度条区域
+        progress_html = f"""
+        <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                    padding: 20px;
+                    border-radius: 10px;
+                    margin: 10px 0;
+                    box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);">
+            <div style="background-color: rgba(255, 255, 255, 0.1);
+                        border-radius: 8px;
+                        padding: 15px;
+                        margin-bottom: 15px;">
+                <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
+                    <span style="color: white; font-size: 16px; font-weight: bold;">总体进度</span>
+                    <span style="color: white; font-size: 18px; font-weight: bold;">{progress_value*100:.2f}%</span>
+                </div>
+                <div style="background-color: rgba(0, 0, 0, 0.2);
+                            height: 30px;
+                            border-radius: 15px;
+                            overflow: hidden;
+                            position: relative;">
+                    <div style="background: linear-gradient(90deg, #4facfe 0%, #00f2fe 100%);
+                                height: 100%;
+                                width: {progress_value*100}%;
+                                transition: width 0.3s ease;
+                                border-radius: 15px;
+                                box-shadow: 0 2px 4px rgba(0, 0, 0, 0.2);">
+                    </div>
+                </div>
+            </div>
+            <div style="background-color: rgba(255, 255, 255, 0.95);
+                        border-radius: 8px;
+                        padding: 15px;
+                        margin-top: 10px;">
+                <div style="font-size: 22px;
+                            font-weight: bold;
+                            color: #333;
+                            text-align: center;
+                            line-height: 1.6;">
+                    <span style="color: #667eea;">📊 进度：{processed}/{total} ({progress_value*100:.2f}%)</span>
+                    <span style="margin: 0 10px;">|</span>
+                    <span style="color: #10b981;">✅ 通过：{passed}</span>
+                    <span style="margin: 0 10px;">|</span>
+                    <span style="color: #ef4444;">❌ 失败：{failed}</span>
+                </div>
+            </div>
+        </div>
+        """
+        st.markdown(progress_html, unsafe_allow_html=True)
+
+        # 同时使用Streamlit原生进度条作为备用（确保兼容性）
+        st.progress(progress_value)
+
+
 def page_full_market_screening():
     """
     全网筛选页面 - 简化版本，一步步实现
@@ -1873,15 +2488,17 @@ def page_full_market_screening():
             - 估值阈值：PR ≤ 用户设定的上限（默认1.0）
             - ROE要求：≥ 用户设定的下限（默认10.0%）
     """
+    # session_state属性访问走__getattr__→内部dict，热路径绑定一次局部别名
+    ss = st.session_state
     # 初始化session_state（简化版）
-    if 'screening_results' not in st.session_state:
-        st.session_state.screening_results = []
-    if 'stock_list' not in st.session_state:
-        st.session_state.stock_list = None  # 缓存股票列表
-    if 'screening_in_progress' not in st.session_state:
-        st.session_state.screening_in_progress = False  # 筛选是否进行中
-    if 'screening_progress' not in st.session_state:
-        st.session_state.screening_progress = {
+    if 'screening_results' not in ss:
+        ss.screening_results = []
+    if 'stock_list' not in ss:
+        ss.stock_list = None  # 缓存股票列表
+    if 'screening_in_progress' not in ss:
+        ss.screening_in_progress = False  # 筛选是否进行中
+    if 'screening_progress' not in ss:
+        ss.screening_progress = {
             'processed': 0,
             'total': 0,
             'passed': 0,
@@ -1891,8 +2508,8 @@ def page_full_market_screening():
             'last_update_time': datetime.now(),  # 记录最后更新时间
             'time_records': []  # 记录每只股票的耗时
         }
-    if 'screening_history' not in st.session_state:
-        st.session_state.screening_history = []  # 筛选历史记录
+    if 'screening_history' not in ss:
+        ss.screening_history = []  # 筛选历史记录
 
     # 左侧配置面板
     with st.sidebar:
@@ -1935,7 +2552,7 @@ def page_full_market_screening():
         try:
             from utils import get_api_delay
             # 从session_state读取积分信息（避免重复调用API）
-            points_info = st.session_state.get('user_points_info', None)
+            points_info = ss.get('user_points_info', None)
             if points_info:
                 user_points = points_info.get('total_points', 2000)
                 # 显示积分等级
@@ -1984,8 +2601,8 @@ def page_full_market_screening():
         # 历史记录
         st.subheader("📜 历史记录")
         
-        if st.session_state.screening_history:
-            for record in st.session_state.screening_history[-10:]:  # 显示最近10条
+        if ss.screening_history:
+            for record in ss.screening_history[-10:]:  # 显示最近10条
                 date_str = record.get('date', '')
                 count = record.get('count', 0)
                 st.caption(f"{date_str} ({count}只)")
@@ -2014,47 +2631,55 @@ def page_full_market_screening():
         if st.button("🚀 获取全部A股股票列表", type="primary", use_container_width=True):
             with st.spinner("正在获取股票列表..."):
                 try:
-                    screener = StockScreener()
-                    stock_list = screener.get_a_stock_list(exclude_st=True)
-                    st.session_state.stock_list = stock_list
+                    stock_list = _cached_stock_list(exclude_st=True)
+                    ss.stock_list = stock_list
+                    # 同时存一份records列表：热路径按下标取dict，不再iloc出Series
+                    ss.stock_records = (
+                        stock_list[['ts_code', 'name', 'area', 'industry']].to_dict('records')
+                    )
                     # DEBUG: Filter for 000429.SZ only
-                    # st.session_state.stock_list = stock_list[stock_list['ts_code'] == '000429.SZ']  # Removed debug filter
+                    # ss.stock_list = stock_list[stock_list['ts_code'] == '000429.SZ']  # Removed debug filter
                     st.success(f"✅ 成功获取 {len(stock_list)} 只A股股票（已排除ST股）")
                     st.info("💡 股票列表已加载，可以开始筛选")
                 except Exception as e:
                     st.error(f"❌ 获取股票列表失败：{e}")
-                    if st.session_state.debug_mode:
+                    if ss.debug_mode:
                         st.exception(e)
     
     with col2:
-        if st.session_state.stock_list is not None:
+        if ss.stock_list is not None:
             if st.button("🔄 重置", use_container_width=True):
-                st.session_state.stock_list = None
-                st.session_state.screening_results = []
-                st.session_state.screening_in_progress = False
+                ss.stock_list = None
+                ss.stock_records = None
+                ss.screening_results = []
+                ss.screening_in_progress = False
                 st.rerun()
     
     # 显示已加载的股票列表信息
-    if st.session_state.stock_list is not None:
-        stock_list = st.session_state.stock_list
+    if ss.stock_list is not None:
+        stock_list = ss.stock_list
         st.success(f"✅ 已加载 {len(stock_list)} 只A股股票")
         
-        # 显示前10只股票作为预览
+        # 显示前10只股票作为预览（直接切records，不再切整个DataFrame）
         with st.expander("📊 股票列表预览（前10只）", expanded=False):
-            preview_df = stock_list.head(10)[['ts_code', 'name', 'area', 'industry']]
-            st.dataframe(preview_df, use_container_width=True, hide_index=True)
+            records = ss.get('stock_records') or (
+                stock_list[['ts_code', 'name', 'area', 'industry']].to_dict('records')
+            )
+            st.dataframe(pd.DataFrame(records[:10]), use_container_width=True, hide_index=True)
         
         if st.button("🔄 重新获取股票列表", use_container_width=True):
-            st.session_state.stock_list = None
+            ss.stock_list = None
+            ss.stock_records = None
+            _cached_stock_list.clear()  # 失效缓存，下次点击真正重新拉取
             st.rerun()
     
     st.divider()
     
     # 第二步：开始筛选（如果股票列表已获取）
-    if st.session_state.stock_list is not None:
+    if ss.stock_list is not None:
         st.subheader("🔍 第二步：开始筛选")
         
-        stock_list = st.session_state.stock_list
+        stock_list = ss.stock_list
         total_stocks = len(stock_list)
         
         # 使用全量历史数据策略
@@ -2064,13 +2689,22 @@ def page_full_market_screening():
         st.info(f"📊 筛选参数：年份范围={start_year}年-{end_year}年（获取所有可用数据，取最近{years}年分析），ROE≥{min_roe}%，PR≤{max_pr}")
         
         # 开始筛选按钮
-        if not st.session_state.screening_in_progress:
+        if not ss.screening_in_progress:
             if st.button("🚀 开始全网筛选", type="primary", use_container_width=True):
                 # 初始化筛选状态
-                st.session_state.screening_in_progress = True
-                st.session_state.screening_results = []
+                ss.screening_in_progress = True
+                ss.screening_results = []
+                # 冻结本轮筛选参数：整批股票在同一组参数下分析，
+                # 中途调整侧边栏控件不影响进行中的筛选
+                ss.screening_params = {
+                    'years': int(years),
+                    'min_roe': float(min_roe),
+                    'max_pr': float(max_pr),
+                    'api_delay': float(api_delay),
+                    'max_workers': int(max_workers),
+                }
                 start_time = datetime.now().timestamp()  # 使用时间戳（更稳定）
-                st.session_state.screening_progress = {
+                ss.screening_progress = {
                     'processed': 0,
                     'total': total_stocks,
                     'passed': 0,
@@ -2082,355 +2716,231 @@ def page_full_market_screening():
                 }
                 st.rerun()
         else:
-            # 筛选进行中，显示进度
-            progress = st.session_state.screening_progress
+            # 筛选进行中：股票按窗口分批提交线程池，每个窗口跑完rerun一次。
+            # 停止按钮渲染在处理块之前，窗口间的rerun会先处理点击，
+            # 多小时的全市场筛选随时可以停下来（整批一次性提交时
+            # 按钮在阻塞代码之后，筛选期间根本不会被渲染）
+            if st.button("⏹️ 停止筛选", use_container_width=True):
+                ss.screening_in_progress = False
+                st.warning("⏸️ 筛选已停止")
+                st.rerun()
+
+            _render_screening_progress()
+
+            progress = ss.screening_progress
             processed = progress['processed']
             total = progress['total']
-            passed = progress['passed']
-            failed = progress['failed']
-            start_time = progress.get('start_time')
-            if start_time is None:
-                start_time = datetime.now().timestamp()
-                st.session_state.screening_progress['start_time'] = start_time
-            
-            # 确保start_time是时间戳(float)
-            if isinstance(start_time, datetime):
-                start_time = start_time.timestamp()
-            
-            last_update_time = progress.get('last_update_time', start_time)
-            time_records = progress.get('time_records', [])
-            
-            # 计算时间信息
-            current_timestamp = datetime.now().timestamp()
-            
-            # 优先使用累积耗时（更准确，不受start_time重置影响）
-            if time_records:
-                elapsed_time = sum(time_records)
-            else:
-                elapsed_time = current_timestamp - start_time
-            
-            # 计算平均每只股票耗时
-            avg_time_per_stock = 0
-            if time_records:
-                # 优先使用记录的每只股票耗时计算平均值（更准确）
-                avg_time_per_stock = sum(time_records) / len(time_records)
-            elif processed > 0:
-                # 降级方案：使用总耗时/已处理数量
-                avg_time_per_stock = elapsed_time / processed
-            
-            # 预估剩余时间
-            remaining_stocks = total - processed
-            estimated_remaining_time = 0
-            if processed > 0 and remaining_stocks > 0:
-                # 如果有平均时间，用平均时间；否则用当前速度
-                if avg_time_per_stock > 0:
-                    estimated_remaining_time = avg_time_per_stock * remaining_stocks
-            
-            # 格式化时间显示
-            def format_time(seconds):
-                """格式化时间显示"""
-                if seconds < 60:
-                    return f"{int(seconds)}秒"
-                elif seconds < 3600:
-                    minutes = int(seconds // 60)
-                    secs = int(seconds % 60)
-                    return f"{minutes}分{secs}秒"
-                else:
-                    hours = int(seconds // 3600)
-                    minutes = int((seconds % 3600) // 60)
-                    secs = int(seconds % 60)
-                    return f"{hours}小时{minutes}分{secs}秒"
-            
-            # 美化UI：时间信息卡片
-            # 将时间戳转为datetime对象用于显示
-            start_dt = datetime.fromtimestamp(start_time)
-            
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("🕒 开始时间", start_dt.strftime('%H:%M:%S'))
-            with col2:
-                st.metric("⏱️ 已用时间", format_time(elapsed_time))
-            with col3:
-                if avg_time_per_stock > 0:
-                    avg_text = f"{avg_time_per_stock:.2f}秒"
-                else:
-                    avg_text = "计算中..."
-                st.metric("📊 平均运行", avg_text)
-            with col4:
-                # 剩余时间
-                if estimated_remaining_time > 0:
-                    remaining_text = format_time(estimated_remaining_time)
-                elif processed > 0:
-                     # 如果已经开始处理但还没算出剩余时间（极少情况）
-                     remaining_text = "计算中..."
-                else:
-                    remaining_text = "准备中..."
-                st.metric("⏳ 剩余时间", remaining_text)
-            
-            # 美化UI：进度条和进度信息（使用卡片样式）
-            if total > 0:
-                progress_value = processed / total
-                
-                # 进度卡片容器
-                st.markdown("---")
-                st.markdown("### 📊 筛选进度")
-                
-                # 使用自定义样式美化进度条区域
-                progress_html = f"""
-                <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                            padding: 20px; 
-                            border-radius: 10px; 
-                            margin: 10px 0;
-                            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);">
-                    <div style="background-color: rgba(255, 255, 255, 0.1); 
-                                border-radius: 8px; 
-                                padding: 15px; 
-                                margin-bottom: 15px;">
-                        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
-                            <span style="color: white; font-size: 16px; font-weight: bold;">总体进度</span>
-                            <span style="color: white; font-size: 18px; font-weight: bold;">{progress_value*100:.2f}%</span>
-                        </div>
-                        <div style="background-color: rgba(0, 0, 0, 0.2); 
-                                    height: 30px; 
-                                    border-radius: 15px; 
-                                    overflow: hidden;
-                                    position: relative;">
-                            <div style="background: linear-gradient(90deg, #4facfe 0%, #00f2fe 100%); 
-                                        height: 100%; 
-                                        width: {progress_value*100}%; 
-                                        transition: width 0.3s ease;
-                                        border-radius: 15px;
-                                        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.2);">
-                            </div>
-                        </div>
-                    </div>
-                    <div style="background-color: rgba(255, 255, 255, 0.95); 
-                                border-radius: 8px; 
-                                padding: 15px; 
-                                margin-top: 10px;">
-                        <div style="font-size: 22px; 
-                                    font-weight: bold; 
-                                    color: #333; 
-                                    text-align: center;
-                                    line-height: 1.6;">
-                            <span style="color: #667eea;">📊 进度：{processed}/{total} ({progress_value*100:.2f}%)</span>
-                            <span style="margin: 0 10px;">|</span>
-                            <span style="color: #10b981;">✅ 通过：{passed}</span>
-                            <span style="margin: 0 10px;">|</span>
-                            <span style="color: #ef4444;">❌ 失败：{failed}</span>
-                        </div>
-                    </div>
-                </div>
-                """
-                st.markdown(progress_html, unsafe_allow_html=True)
-                
-                # 同时使用Streamlit原生进度条作为备用（确保兼容性）
-                st.progress(progress_value)
-            
-            # 处理股票（每次刷新处理一只）
-            screener = StockScreener()  # 使用全局导入的StockScreener
-            stock_list = st.session_state.stock_list
+
+            # 读取开始筛选时冻结的参数（而非本次rerun的控件值）
+            params = ss.get('screening_params')
+            if params:
+                years = params['years']
+                min_roe = params['min_roe']
+                max_pr = params['max_pr']
+                api_delay = params['api_delay']
+                max_workers = params['max_workers']
+
+            # 处理股票：线程池批量并发处理，不再每只股票rerun整个页面
+            screener = _get_screener()  # 进程级单例，避免每次rerun重建客户端
+            stock_list = ss.stock_list
             current_index = progress.get('current_index', 0)
             
             # 处理全部股票（不是测试模式）
             if current_index < total_stocks:
-                # 还有股票需要处理
-                stock_row = stock_list.iloc[current_index]
-                ts_code = stock_row['ts_code']
-                stock_name = stock_row['name']
-                
-                st.info(f"🔄 正在处理：{ts_code} ({stock_name}) [{current_index + 1}/{total_stocks}]")
-                
-                try:
-                    # 优化：强制使用全量历史数据策略（1990-2999）
-                    # 确保获取所有可用数据，然后由analyze_fundamentals内部逻辑处理
-                    # 彻底解决因年报发布时间判断不准导致的数据不足问题
-                    analysis_start_year, analysis_end_year = 1990, 2999
-                    
-                    # 从session_state获取积分信息（避免重复调用API）
-                    user_points = None
-                    if 'user_points_info' in st.session_state and st.session_state.user_points_info:
-                        user_points = st.session_state.user_points_info.get('total_points', 2000)
-                    
-                    # 调用深度分析（传递并发线程数，用于计算合适的延迟）
-                    result = analyze_fundamentals(
-                        ts_code=ts_code,
-                        start_date=f"{analysis_start_year}0101",
-                        end_date=f"{analysis_end_year}1231",
-                        years=years,  # 这个参数在指定日期范围时会被忽略
-                        use_cache=True,
-                        api_delay=api_delay,
-                        max_workers=1,  # 单线程模式（因为这里是串行处理）
-                        user_points=user_points  # 传入积分信息，避免重复调用API
+                # 从session_state获取积分信息（避免重复调用API）
+                user_points = None
+                if 'user_points_info' in ss and ss.user_points_info:
+                    user_points = ss.user_points_info.get('total_points', 2000)
+
+                status_text = st.empty()
+                batch_bar = st.progress(processed / total if total else 0.0)
+                # 通过筛选的股票实时滚动展示，不用等全部跑完
+                results_placeholder = st.empty()
+
+                # 信号量限制同时访问API的线程数，与线程池并发上限一致
+                api_semaphore = threading.Semaphore(int(max_workers))
+                if 'stock_records' not in ss or ss.stock_records is None:
+                    ss.stock_records = (
+                        stock_list[['ts_code', 'name', 'area', 'industry']].to_dict('records')
                     )
-                    
-                    
-                    # DEBUG: 000429.SZ specific logging
-                    if ts_code == '000429.SZ':
-                        st.warning(f"🔍 DEBUG 000429.SZ: Start Analysis")
-                        st.warning(f"📅 Years: {analysis_start_year}-{analysis_end_year} (Required: {years})")
-                        if result:
-                            metrics_debug = result.get('metrics')
-                            audit_debug = result.get('audit_records', [])
-                            st.warning(f"📋 Metrics: {len(metrics_debug) if metrics_debug is not None else 'None'}, Audit: {len(audit_debug)}")
-                            if metrics_debug is not None and not metrics_debug.empty:
-                                st.dataframe(metrics_debug[['end_date', 'n_income', 'n_cashflow_act']].head())
-                        else:
-                            st.error("❌ Result is None")
+                # 本窗口要处理的股票（窗口间rerun重检停止标志）
+                window = ss.stock_records[current_index:current_index + _SCREENING_WINDOW]
+
+                # 批量预取全市场估值快照：1次daily_basic请求替代逐股N次
+                # （快照按交易日落盘缓存，后续窗口直接命中缓存）
+                valuation_snapshot = screener.fetch_valuation_snapshot()
+
+                prog_state = ss.screening_progress
+                # 窗口回滚快照：窗口中途被rerun打断（点击停止或任意交互）
+                # 时恢复到窗口起点，下次run整窗重跑——逐股结果有持久化
+                # 缓存，重跑代价很低，且不会跳过或重复计入任何股票
+                snap_counts = (prog_state['passed'], prog_state['failed'],
+                               len(prog_state['time_records']),
+                               len(prog_state.get('errors', [])),
+                               len(ss.screening_results))
+                window_done = False
+
+                # 网络阶段保持线程池：tushare SDK是同步requests实现，
+                # 无法换成asyncio/aiohttp；阻塞I/O期间线程会释放GIL，
+                # 并发上限由信号量（API限流）而非线程开销决定
+                executor = ThreadPoolExecutor(max_workers=int(max_workers))
+                try:
+                    future_to_stock = {
+                        executor.submit(
+                            _screen_single_stock, screener, rec['ts_code'], rec['name'],
+                            years, min_roe, max_pr, api_delay, user_points, api_semaphore,
+                            valuation_snapshot.get(rec['ts_code'])
+                        ): rec
+                        for rec in window
+                    }
 
-                    if result:
-                        audit_records = result.get('audit_records', [])
-                        metrics = result.get('metrics')
-                        
-                        if metrics is not None and not metrics.empty:
-                            # 基本面检查（重要：这里之前缺少了check_fundamentals_pass调用！）
-                            fundamentals_pass, fundamentals_details = screener.check_fundamentals_pass(
-                                audit_records=audit_records,
-                                metrics=metrics,
-                                required_years=years  # 修复：使用required_years参数（默认5年）
+                    done_count = current_index
+                    for future in as_completed(future_to_stock):
+                        rec = future_to_stock[future]
+                        try:
+                            passed_flag, stock_result, stock_time = future.result()
+                        except Exception as e:
+                            passed_flag, stock_result, stock_time = False, None, 0.0
+                            # 不逐条st.warning（长跑下会堆出上千个DOM元素），
+                            # 错误先收集，批量结束后一次性展示
+                            prog_state.setdefault('errors', []).append(
+                                f"{rec['ts_code']} ({rec['name']})：{e}"
                             )
-                            
-                            if ts_code == '000429.SZ':
-                                st.warning(f"✅ Fundamentals Pass: {fundamentals_pass}")
-                                st.json(fundamentals_details)
-
-                            if fundamentals_pass:
-                                # 基本面通过，检查估值
-                                valuation_pass, valuation_details = screener.check_valuation_pass(
-                                    ts_code=ts_code,
-                                    pr_threshold=max_pr,
-                                    min_roe=min_roe
-                                )
-                                
-                                if ts_code == '000429.SZ':
-                                    st.warning(f"💰 Valuation Pass: {valuation_pass}")
-                                    st.json(valuation_details)
-
-                                if valuation_pass:
-                                    # 通过所有筛选，添加到结果
-                                    stock_result = {
-                                        'ts_code': ts_code,
-                                        'name': stock_name,
-                                        'fundamentals_details': fundamentals_details,
-                                        'valuation_details': valuation_details
-                                    }
-                                    st.session_state.screening_results.append(stock_result)
-                                    st.session_state.screening_progress['passed'] += 1
-                                else:
-                                    st.session_state.screening_progress['failed'] += 1
-                            else:
-                                st.session_state.screening_progress['failed'] += 1
-                        else:
-                            st.session_state.screening_progress['failed'] += 1
-                    else:
-                        st.session_state.screening_progress['failed'] += 1
 
-                    
-                    # 更新进度和时间记录
-                    current_timestamp = datetime.now().timestamp()
-                    progress_start_time = st.session_state.screening_progress.get('start_time', current_timestamp)
-                    
-                    # 确保是float
-                    if isinstance(progress_start_time, datetime):
-                        progress_start_time = progress_start_time.timestamp()
-
-                    if current_index > 0:
-                        # 计算当前股票的耗时（从上次更新到现在）
-                        last_time = st.session_state.screening_progress.get('last_update_time', progress_start_time)
-                        
-                        # 确保是float
-                        if isinstance(last_time, datetime):
-                            last_time = last_time.timestamp()
-                            
-                        stock_time = current_timestamp - last_time
-                        time_records = st.session_state.screening_progress.get('time_records', [])
-                        time_records.append(stock_time)
-                        st.session_state.screening_progress['time_records'] = time_records
-                    
-                    st.session_state.screening_progress['processed'] = current_index + 1
-                    st.session_state.screening_progress['current_index'] = current_index + 1
-                    st.session_state.screening_progress['last_update_time'] = current_timestamp
-                    
-                    # 继续处理下一只（自动刷新）
-                    time.sleep(0.5)  # 短暂延迟，让用户看到进度
-                    st.rerun()
-                    
-                except Exception as e:
-                    # 处理失败
-                    current_time = datetime.now()
-                    progress_start_time = st.session_state.screening_progress.get('start_time', current_time)
-                    if current_index > 0:
-                        # 计算当前股票的耗时（从上次更新到现在）
-                        last_time = st.session_state.screening_progress.get('last_update_time', progress_start_time)
-                        stock_time = (current_time - last_time).total_seconds()
-                        time_records = st.session_state.screening_progress.get('time_records', [])
-                        time_records.append(stock_time)
-                        st.session_state.screening_progress['time_records'] = time_records
-                    
-                    st.session_state.screening_progress['failed'] += 1
-                    st.session_state.screening_progress['processed'] = current_index + 1
-                    st.session_state.screening_progress['current_index'] = current_index + 1
-                    st.session_state.screening_progress['last_update_time'] = current_time
-                    if st.session_state.debug_mode:
-                        st.warning(f"处理 {ts_code} 失败：{e}")
-                    time.sleep(0.5)
-                    st.rerun()
+                        if passed_flag and stock_result:
+                            # 入选时拍平成NamedTuple记录，排序/表格不再逐行查嵌套dict
+                            valuation = stock_result.get('valuation_details', {})
+                            fundamentals = stock_result.get('fundamentals_details', {})
+                            ss.screening_results.append(ScreeningRecord(
+                                ts_code=stock_result['ts_code'],
+                                name=stock_result.get('name', '未知'),
+                                final_pr=_result_final_pr(stock_result, default=None),
+                                roe_waa=valuation.get('ROE(加权)'),
+                                pe_ttm=valuation.get('PE(TTM)'),
+                                audit_pass=fundamentals.get('audit_pass', False),
+                                cashflow_pass=fundamentals.get('cashflow_pass', False),
+                            ))
+                            prog_state['passed'] += 1
+                            # 命中即刷新中间结果表（通过的股票本来就少，
+                            # 单placeholder原地更新，不会堆积DOM元素）
+                            hits = ss.screening_results
+                            results_placeholder.dataframe(
+                                pd.DataFrame({
+                                    '代码': [s.ts_code for s in hits],
+                                    '名称': [s.name for s in hits],
+                                    'PR': [s.final_pr for s in hits],
+                                }),
+                                use_container_width=True,
+                                hide_index=True
+                            )
+                        else:
+                            prog_state['failed'] += 1
+
+                        done_count += 1
+                        prog_state['time_records'].append(stock_time)
+                        prog_state['processed'] = done_count
+                        prog_state['current_index'] = done_count
+                        prog_state['last_update_time'] = datetime.now().timestamp()
+
+                        # 进度控件每20只刷新一次：剩余的"提交开销"就是
+                        # 每只股票两次前端消息推送，按批摊薄后
+                        # 5000只股票从1万次推送降到几百次
+                        if done_count % _PROGRESS_UPDATE_EVERY == 0 or done_count == total_stocks:
+                            status_text.text(f"🔄 已处理：{rec['ts_code']} ({rec['name']}) [{done_count}/{total_stocks}]")
+                            batch_bar.progress(done_count / total_stocks)
+
+                    window_done = True
+                finally:
+                    # 中途rerun会在上面的st.*调用处抛RerunException：
+                    # 放弃未开始的任务且不等待在跑的网络请求（wait=True
+                    # 会把script线程卡死在剩余future上，会话无法响应）
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    if not window_done:
+                        # 回滚本窗口的部分进度，窗口起点重跑
+                        prog_state['passed'] = snap_counts[0]
+                        prog_state['failed'] = snap_counts[1]
+                        del prog_state['time_records'][snap_counts[2]:]
+                        if 'errors' in prog_state:
+                            del prog_state['errors'][snap_counts[3]:]
+                        del ss.screening_results[snap_counts[4]:]
+                        prog_state['processed'] = current_index
+                        prog_state['current_index'] = current_index
+
+                # 本窗口处理完成，rerun重检停止标志后继续下一窗口
+                # （全部跑完后进入下方完成态分支做排序和汇总）
+                st.rerun()
             else:
                 # 所有股票处理完成
-                st.session_state.screening_in_progress = False
-                final_passed = st.session_state.screening_progress['passed']
-                final_processed = st.session_state.screening_progress['processed']
+                ss.screening_in_progress = False
+                final_passed = ss.screening_progress['passed']
+                final_processed = ss.screening_progress['processed']
                 st.success(f"✅ 筛选完成！处理了 {final_processed} 只股票，通过 {final_passed} 只")
+
+                # 批量收集的处理错误一次性展示（而非筛选中逐条刷警告）
+                errors = ss.screening_progress.get('errors', [])
+                if errors and ss.debug_mode:
+                    with st.expander(f"⚠️ {len(errors)} 只股票处理出错", expanded=False):
+                        for msg in errors[:50]:
+                            st.caption(msg)
+                        if len(errors) > 50:
+                            st.caption(f"……其余 {len(errors) - 50} 条省略")
                 
                 # 如果有结果，按PR排序（从低到高）
-                if st.session_state.screening_results:
-                    st.session_state.screening_results.sort(
-                        key=lambda x: x.get('valuation_details', {}).get('final_pr', float('inf'))
+                # 先一次性抽出PR数组再argsort：C层排序，
+                # 不在比较回调里做Python层取值
+                if ss.screening_results:
+                    results = ss.screening_results
+                    prs = np.fromiter(
+                        (float('inf') if s.final_pr is None else s.final_pr for s in results),
+                        dtype=np.float64, count=len(results)
                     )
+                    order = np.argsort(prs, kind='stable')
+                    ss.screening_results = [results[i] for i in order]
                     st.info(f"📊 结果已按修正市赚率（PR）从低到高排序")
-            
-            # 停止按钮
-            if st.button("⏹️ 停止筛选", use_container_width=True):
-                st.session_state.screening_in_progress = False
-                st.warning("⏸️ 筛选已停止")
-                st.rerun()
-    
-    # 结果展示区域
-    if st.session_state.screening_results:
+
+    # 结果展示区域（结果列表绑定一次局部变量，循环内不再反复进session_state）
+    results = ss.screening_results
+    if results:
         st.divider()
         st.subheader("📊 筛选结果")
-        st.info(f"✅ 共找到 {len(st.session_state.screening_results)} 只符合条件的股票（已按PR从低到高排序）")
-        
-        # 构建表格数据
-        table_data = []
-        for i, stock in enumerate(st.session_state.screening_results, 1):
-            valuation = stock.get('valuation_details', {})
-            fundamentals = stock.get('fundamentals_details', {})
-            
-            # 获取PR值（修正PR优先，如果没有则用标准PR）
-            final_pr = valuation.get('final_pr')
-            if final_pr is None:
-                final_pr = valuation.get('standard_pr')
-            
-            table_data.append({
-                '排名': i,
-                '代码': stock['ts_code'],
-                '名称': stock.get('name', '未知'),
-                'PR': f"{final_pr:.4f}" if final_pr is not None else "-",
-                'ROE(%)': f"{valuation.get('roe_waa', 0):.2f}" if valuation.get('roe_waa') is not None else "-",
-                'PE(TTM)': f"{valuation.get('pe_ttm', 0):.2f}" if valuation.get('pe_ttm') is not None else "-",
-                '审计通过': "✅" if fundamentals.get('audit_pass', False) else "❌",
-                '现金流通过': "✅" if fundamentals.get('cashflow_pass', False) else "❌",
-            })
-        
-        df_results = pd.DataFrame(table_data)
-        st.dataframe(df_results, use_container_width=True, hide_index=True)
+        st.info(f"✅ 共找到 {len(results)} 只符合条件的股票（已按PR从低到高排序）")
+
+        # 构建表格数据：记录本身就是NamedTuple，zip(*)一步转列
+        # （字段顺序即ScreeningRecord定义顺序），不再逐行查嵌套dict
+        codes, names, prs, roes, pes, audits, cashflows = zip(*results)
+
+        # 数值列保持float原值，格式化交给column_config在前端完成：
+        # 省掉每次渲染N次Python字符串格式化，且表头可以按数值正确排序
+        df_results = pd.DataFrame({
+            '排名': np.arange(1, len(codes) + 1),
+            '代码': codes,
+            '名称': names,
+            'PR': np.asarray(prs, dtype=np.float64),
+            'ROE(%)': np.asarray(roes, dtype=np.float64),
+            'PE(TTM)': np.asarray(pes, dtype=np.float64),
+            '审计通过': np.where(audits, "✅", "❌"),
+            '现金流通过': np.where(cashflows, "✅", "❌"),
+        })
+        # st.dataframe传输层本来就是Arrow：转成pyarrow后端dtype后
+        # 字符串列不再是object装箱，交给前端时免去一次整表转换
+        df_results = df_results.convert_dtypes(dtype_backend='pyarrow')
+        st.dataframe(
+            df_results,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'PR': st.column_config.NumberColumn('PR', format='%.4f'),
+                'ROE(%)': st.column_config.NumberColumn('ROE(%)', format='%.2f'),
+                'PE(TTM)': st.column_config.NumberColumn('PE(TTM)', format='%.2f'),
+            }
+        )
         
         # 导出按钮
-        csv = df_results.to_csv(index=False, encoding='utf-8-sig')
+        # 序列化结果按内容缓存：没点下载按钮时rerun不再重复to_csv
+        csv_bytes = _results_csv_bytes(df_results)
         st.download_button(
             label="📥 导出CSV",
-            data=csv,
+            data=csv_bytes,
             file_name=f"全网筛选结果_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
             mime='text/csv'
         )
@@ -2439,6 +2949,9 @@ def page_full_market_screening_old():
     """旧版本（已废弃，保留作为参考）"""
     pass
 
+# 历史记录得分图标：按阈值[2.0, 2.5)分桶（橙/黄/绿）
+_HISTORY_ICONS = np.array(['🟠', '🟡', '🟢'])
+
 def page_history():
     """历史记录页面"""
     st.header("🕘 历史记录")
@@ -2449,12 +2962,19 @@ def page_history():
         st.info("📭 暂无历史记录")
         return
 
-    for record in history[:50]:
+    shown = history[:50]
+    # 图标分级一次性向量化：searchsorted按[2.0, 2.5]分桶后查表，
+    # 替代逐条记录的两层条件表达式（无分支，记录多时也不退化）
+    scores = np.fromiter(
+        (r.get('avg_score', 0) for r in shown), dtype=np.float64, count=len(shown)
+    )
+    icons = _HISTORY_ICONS[np.searchsorted([2.0, 2.5], scores, side='right')]
+
+    for record, icon in zip(shown, icons):
         time = record.get('time', '')
         code = record.get('code', '')
         sector = record.get('sector', '')
         avg_score = record.get('avg_score', 0)
-        icon = "🟢" if avg_score >= 2.5 else "🟡" if avg_score >= 2.0 else "🟠"
 
         with st.expander(f"{icon} {time} - {code} ({sector}) - 得分: {avg_score:.2f}", expanded=False):
             col1, col2, col3 = st.columns(3)
@@ -2869,118 +3389,128 @@ def page_watchlist():
         else:
             st.info("暂无历史记录。当监控到金叉/死叉信号时，系统会自动保存。")
 
-def main():
-    """主函数"""
-    # ========== 积分信息获取（页面置顶，只调用一次，缓存到session_state） ==========
-    # 使用持久化缓存避免频繁查询（积分信息变化不频繁，每天最多50次查询限制）
-    # 缓存键：使用固定键名，确保所有会话共享同一缓存
+@st.cache_data(ttl=600, show_spinner=False)
+def _cached_points_info():
+    """
+    Tushare积分信息的进程级缓存（10分钟TTL）
+
+    取代此前session_state+手写临时文件的多层缓存：
+    st.cache_data跨会话共享且线程安全；持久化缓存仍按天兜底
+    （积分查询接口每天最多50次），损坏/过期文件由data_cache内部处理
+    """
     cache_key = 'user_points_info_daily'
-    
-    # 初始化session_state中的积分信息（如果不存在）
-    if 'user_points_info' not in st.session_state:
-        st.session_state.user_points_info = None
-    
-    # 先检查session_state中是否已有积分信息（避免重复调用）
-    points_info = st.session_state.user_points_info
-    
-    # 如果session_state中没有，则从持久化缓存读取
-    if points_info is None:
-        try:
-            points_info = data_cache.get(cache_key)
-            # 如果从缓存读取成功，保存到session_state
-            if points_info:
-                st.session_state.user_points_info = points_info
-        except Exception as cache_read_error:
-            # 缓存读取失败（可能是JSON格式错误），尝试修复
-            if st.session_state.debug_mode:
-                st.warning(f"⚠️ 缓存读取失败，尝试修复：{cache_read_error}")
-            cache_path = data_cache.get_cache_file_path(cache_key)
-            if os.path.exists(cache_path):
-                try:
-                    # 尝试直接读取缓存文件（不检查过期时间）
-                    with open(cache_path, 'r', encoding='utf-8') as f:
-                        cache_data = json.load(f)
-                    points_info = cache_data.get('data')
-                    if points_info:
-                        cache_time = cache_data.get('datetime', '未知')
-                        if st.session_state.debug_mode:
-                            st.info(f"✅ 从损坏的缓存文件中恢复数据（缓存时间：{cache_time}）")
-                        # 保存到session_state
-                        st.session_state.user_points_info = points_info
-                except Exception as repair_error:
-                    # 缓存文件完全损坏，删除它
-                    if st.session_state.debug_mode:
-                        st.warning(f"⚠️ 缓存文件损坏，删除并重新获取：{repair_error}")
-                    try:
-                        os.remove(cache_path)
-                    except:
-                        pass
-                    points_info = None
-    
-    # 如果仍然没有积分信息，调用API（只调用一次）
-    if points_info is None:
-        # 缓存不存在或已过期，需要调用API
-        try:
-            if st.session_state.debug_mode:
-                st.info("🔄 正在获取积分信息（每天最多调用一次）...")
-            points_info = get_user_points_info()
-            
-            # 保存到session_state和持久化缓存（24小时有效）
-            if points_info:
-                st.session_state.user_points_info = points_info  # 保存到session_state
-                
-                # 使用临时文件写入，成功后再替换（避免并发写入问题）
-                cache_path = data_cache.get_cache_file_path(cache_key)
-                try:
-                    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
-                    cache_data = {
-                        'data': points_info,
-                        'timestamp': time.time(),
-                        'datetime': datetime.now().isoformat()
+    try:
+        cached = data_cache.get(cache_key)
+        if cached:
+            return cached
+    except Exception:
+        pass
+
+    points_info = get_user_points_info()
+    if points_info:
+        data_cache.set(cache_key, points_info)
+    return points_info
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _points_expiry_df() -> Optional[pd.DataFrame]:
+    """
+    到期记录展示表（与积分信息同周期缓存）
+
+    DataFrame构建、日期解析和积分格式化只在积分信息刷新时执行一次，
+    不再随每次rerun重复。无记录或字段异常时返回None，由调用方提示
+    """
+    points_info = _cached_points_info()
+    if not points_info or not points_info.get('expiry_records'):
+        return None
+
+    expiry_df = pd.DataFrame(points_info['expiry_records'])
+
+    # 确保列名正确（Tushare API返回的字段名）
+    if '到期时间' not in expiry_df.columns and 'expiry_date' in expiry_df.columns:
+        expiry_df['到期时间'] = expiry_df['expiry_date']
+    if '到期积分' not in expiry_df.columns and 'expiry_points' in expiry_df.columns:
+        expiry_df['到期积分'] = expiry_df['expiry_points']
+    if '到期时间' not in expiry_df.columns or '到期积分' not in expiry_df.columns:
+        return None
+
+    # 格式化日期和积分显示
+    display_df = pd.DataFrame({
+        '到期时间': pd.to_datetime(expiry_df['到期时间']).dt.strftime('%Y-%m-%d'),
+        '到期积分': np.char.mod('%.4f', pd.to_numeric(expiry_df['到期积分'], errors='coerce').fillna(0.0).to_numpy(dtype=np.float64)),
+    })
+
+    # 按到期时间排序（最近的在前）
+    return display_df.sort_values('到期时间').reset_index(drop=True)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_cache_info() -> dict:
+    """
+    缓存统计信息的进程级缓存（30秒TTL）
+
+    侧边栏每次rerun都要展示缓存统计，套一层st.cache_data后
+    统计最多每30秒算一次；清理/清空按钮会主动clear()保证及时刷新
+    """
+    return data_cache.get_cache_info()
+
+
+@st.fragment
+def _points_expiry_panel(points_info):
+    """
+    到期记录面板（独立fragment）
+
+    expander折叠时Streamlit仍会执行其body，所以表格构建已由
+    _points_expiry_df按缓存周期复用；fragment进一步把展开/收起等
+    面板内交互限制在本DOM子树重跑，不触发整个main()重新执行
+    """
+    with st.expander("📋 查看详细到期记录", expanded=False):
+        if points_info.get('expiry_records'):
+            st.caption("💡 账户的总积分，用户可以登录tushare pro，在个人主页里可以查看到")
+
+            # 展示表与积分信息同周期缓存，rerun时直接复用
+            display_df = _points_expiry_df()
+
+            if display_df is not None:
+                # 显示表格（按照第三张图片的格式）
+                st.dataframe(
+                    display_df,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "到期时间": st.column_config.TextColumn("到期时间", width="medium"),
+                        "到期积分": st.column_config.TextColumn("到期积分", width="medium")
                     }
-                    temp_path = cache_path + '.tmp'
-                    with open(temp_path, 'w', encoding='utf-8') as f:
-                        json.dump(cache_data, f, ensure_ascii=False, indent=2)
-                    os.replace(temp_path, cache_path)
-                    if st.session_state.debug_mode:
-                        st.success("✅ 积分信息已缓存，24小时内不再调用API")
-                except Exception as cache_save_error:
-                    if st.session_state.debug_mode:
-                        st.warning(f"⚠️ 积分信息缓存保存失败：{cache_save_error}")
-        except Exception as e:
-            # 如果查询失败，尝试使用过期缓存（如果有）
-            cache_path = data_cache.get_cache_file_path(cache_key)
-            if os.path.exists(cache_path):
-                try:
-                    with open(cache_path, 'r', encoding='utf-8') as f:
-                        cache_data = json.load(f)
-                    points_info = cache_data.get('data')
-                    if points_info:
-                        cache_time = cache_data.get('datetime', '未知')
-                        if st.session_state.debug_mode:
-                            st.warning(f"⚠️ 获取积分信息失败，使用过期缓存（缓存时间：{cache_time}）: {e}")
-                        # 保存到session_state
-                        st.session_state.user_points_info = points_info
-                except Exception as read_error:
-                    if st.session_state.debug_mode:
-                        st.error(f"❌ 无法获取积分信息且读取缓存失败: {e}, {read_error}")
+                )
             else:
-                if st.session_state.debug_mode:
-                    st.error(f"❌ 无法获取积分信息且无缓存: {e}")
-    else:
-        # 使用缓存数据（从session_state或持久化缓存）
-        if st.session_state.debug_mode:
-            # 显示缓存信息
-            cache_path = data_cache.get_cache_file_path(cache_key)
-            if os.path.exists(cache_path):
-                try:
-                    with open(cache_path, 'r', encoding='utf-8') as f:
-                        cache_data = json.load(f)
-                    cache_time = cache_data.get('datetime', '未知')
-                    st.caption(f"💾 使用缓存的积分信息（缓存时间：{cache_time}）")
-                except:
-                    pass
-    
+                available = list(pd.DataFrame(points_info['expiry_records']).columns)
+                st.warning(f"⚠️ 积分数据格式异常，缺少必需字段。可用字段：{available}")
+        else:
+            st.caption("暂无积分到期记录")
+
+
+@st.fragment
+def _points_panel():
+    """
+    页面顶部的积分信息面板（独立fragment）
+
+    积分获取+三个metric+到期记录整块只在主脚本rerun时执行一次，
+    面板内交互不再触发main()重跑
+    """
+    ss = st.session_state
+    # ========== 积分信息获取（页面置顶） ==========
+    # st.cache_data进程级缓存10分钟：跨会话/多标签页共享，
+    # 持久化缓存按天兜底（积分查询每天最多50次）
+    try:
+        points_info = _cached_points_info()
+    except Exception as e:
+        points_info = None
+        if ss.debug_mode:
+            st.error(f"❌ 无法获取积分信息: {e}")
+
+    # 其他页面（如全网筛选的延迟规则）仍从session_state读取积分
+    ss.user_points_info = points_info
+
     # 显示积分信息（在页面最顶部）
     if points_info:
         # 显示总积分和到期信息（简洁版，在页面顶部）
@@ -2992,9 +3522,12 @@ def main():
         
         with col2:
             if points_info.get('nearest_expiry_date'):
-                # 计算距离到期的天数
-                expiry_date = datetime.strptime(points_info['nearest_expiry_date'], '%Y-%m-%d')
-                days_left = (expiry_date - datetime.now()).days
+                # 计算距离到期的天数：datetime64按日做差（C层解析ISO日期，
+                # 每次rerun不再走慢速strptime；按日历日比较，当天显示"今日到期"）
+                days_left = int(
+                    np.datetime64(points_info['nearest_expiry_date'], 'D')
+                    - np.datetime64('today', 'D')
+                )
                 st.metric(
                     "最近到期时间",
                     points_info['nearest_expiry_date'],
@@ -3009,60 +3542,22 @@ def main():
             else:
                 st.metric("到期积分", "0")
         
-        # 展开显示详细到期记录表格（按照第三张图片的格式）
-        with st.expander("📋 查看详细到期记录", expanded=False):
-            if points_info.get('expiry_records'):
-                st.caption("💡 账户的总积分，用户可以登录tushare pro，在个人主页里可以查看到")
-                
-                # 创建到期记录表格
-                expiry_df = pd.DataFrame(points_info['expiry_records'])
-                
-                # 确保列名正确（Tushare API返回的字段名）
-                required_cols = []
-                if '到期时间' in expiry_df.columns:
-                    required_cols.append('到期时间')
-                elif 'expiry_date' in expiry_df.columns:
-                    expiry_df['到期时间'] = expiry_df['expiry_date']
-                    required_cols.append('到期时间')
-                
-                if '到期积分' in expiry_df.columns:
-                    required_cols.append('到期积分')
-                elif 'expiry_points' in expiry_df.columns:
-                    expiry_df['到期积分'] = expiry_df['expiry_points']
-                    required_cols.append('到期积分')
-                
-                if len(required_cols) == 2:
-                    # 格式化日期显示
-                    expiry_df['到期时间'] = pd.to_datetime(expiry_df['到期时间']).dt.strftime('%Y-%m-%d')
-                    expiry_df['到期积分'] = expiry_df['到期积分'].apply(lambda x: f"{float(x):.4f}" if pd.notna(x) else "0.0000")
-                    
-                    # 只显示需要的列
-                    display_df = expiry_df[['到期时间', '到期积分']].copy()
-                    
-                    # 按到期时间排序（最近的在前）
-                    display_df = display_df.sort_values('到期时间').reset_index(drop=True)
-                    
-                    # 显示表格（按照第三张图片的格式）
-                    st.dataframe(
-                        display_df,
-                        use_container_width=True,
-                        hide_index=True,
-                        column_config={
-                            "到期时间": st.column_config.TextColumn("到期时间", width="medium"),
-                            "到期积分": st.column_config.TextColumn("到期积分", width="medium")
-                        }
-                    )
-                else:
-                    st.warning(f"⚠️ 积分数据格式异常，缺少必需字段。可用字段：{list(expiry_df.columns)}")
-            else:
-                st.caption("暂无积分到期记录")
-        
+        # 展开显示详细到期记录表格（独立fragment，见函数内说明）
+        _points_expiry_panel(points_info)
+
         st.divider()
     else:
         # 查询失败，显示提示
-        if st.session_state.debug_mode:
+        if ss.debug_mode:
             st.warning("⚠️ 无法获取积分信息（可能达到API调用限制，每天最多50次）")
-    
+
+
+def main():
+    """主函数"""
+    ss = st.session_state  # 侧边栏每次rerun有十几次session_state访问，绑定局部别名
+    # 积分信息面板（fragment内部会把积分写入session_state供其他页面读取）
+    _points_panel()
+
     st.title("📊 A股财务分析系统")
     st.markdown("*基于审计意见与三大核心指标的智能筛选*")
     
@@ -3085,19 +3580,19 @@ def main():
         
         # 行业选择
         st.markdown("### 🏭 行业分类")
-        st.session_state.selected_sector = st.selectbox(
+        ss.selected_sector = st.selectbox(
             "选择行业板块",
-            options=list(SECTOR_RULES.keys()),
-            index=list(SECTOR_RULES.keys()).index(st.session_state.selected_sector),
+            options=_SECTOR_KEYS,
+            index=_SECTOR_IDX[ss.selected_sector],
             help="不同行业有不同的财务健康标准"
         )
         
-        sector_info = SECTOR_RULES[st.session_state.selected_sector]
+        sector_info = SECTOR_RULES[ss.selected_sector]
         st.info(f"""
 **{sector_info['name']}行业标准：**
 - 资产负债率 ≤ {sector_info['debt_ratio_max']}%
 - 毛利率 ≥ {sector_info['gross_margin_min']}%
-- 经营现金流连续≥{st.session_state.ocf_consecutive_years}年为正
+- 经营现金流连续≥{ss.ocf_consecutive_years}年为正
 
 💡 {sector_info['description']}
         """)
@@ -3112,38 +3607,38 @@ def main():
                 "开始年",
                 min_value=1900,
                 max_value=2999,
-                value=st.session_state.start_year,
+                value=ss.start_year,
                 step=1,
                 help="可自由输入任何年份（1900-2999）",
                 key="start_year_input"
             )
             # 如果年份发生变化，更新session_state
-            if new_start_year != st.session_state.start_year:
-                st.session_state.start_year = new_start_year
+            if new_start_year != ss.start_year:
+                ss.start_year = new_start_year
                 st.info(f"✅ 开始年已更新为：{new_start_year}")
         with col2:
             new_end_year = st.number_input(
                 "结束年",
                 min_value=1900,
                 max_value=2999,
-                value=st.session_state.end_year,
+                value=ss.end_year,
                 step=1,
                 help="可自由输入任何年份（1900-2999）",
                 key="end_year_input"
             )
             # 如果年份发生变化，更新session_state
-            if new_end_year != st.session_state.end_year:
-                st.session_state.end_year = new_end_year
+            if new_end_year != ss.end_year:
+                ss.end_year = new_end_year
                 st.info(f"✅ 结束年已更新为：{new_end_year}")
         
         # 显示当前设置的年份范围
-        st.caption(f"📅 当前查询年份范围：{st.session_state.start_year}年 - {st.session_state.end_year}年")
+        st.caption(f"📅 当前查询年份范围：{ss.start_year}年 - {ss.end_year}年")
         
-        st.session_state.ocf_consecutive_years = st.slider(
+        ss.ocf_consecutive_years = st.slider(
             "OCF连续为正年数要求",
             min_value=3,
             max_value=5,
-            value=st.session_state.ocf_consecutive_years,
+            value=ss.ocf_consecutive_years,
             step=1,
             help="经营现金流需要连续多少年为正"
         )
@@ -3155,30 +3650,23 @@ def main():
         
         st.markdown("**根据您的积分等级选择延迟：**")
         
-        delay_options = {
-            "未认证用户 (0-119分)": 31,
-            "注册用户 (120-599分)": 13,
-            "中级用户 (600-4999分)": 0.1,
-            "高级用户 (5000+分)": 0
-        }
-        
         selected_level = st.selectbox(
             "选择您的Tushare等级",
-            options=list(delay_options.keys()),
+            options=_DELAY_LABELS,
             index=2,  # 默认选择"中级用户"（2000积分对应）
             help="根据您的积分选择对应等级，系统会自动设置延迟时间"
         )
+
+        ss.api_delay = _DELAY_MAP[selected_level]
         
-        st.session_state.api_delay = delay_options[selected_level]
-        
-        if st.session_state.api_delay > 0:
-            total_time = st.session_state.api_delay * 4
+        if ss.api_delay > 0:
+            total_time = ss.api_delay * 4
             st.success(f"""
 **✅ 中级用户配置（2000+积分）：**
-- 延迟时间：{st.session_state.api_delay}秒/次
+- 延迟时间：{ss.api_delay}秒/次
 - 单次查询耗时：约**{total_time}秒**（5次API调用）
 - 每分钟可查询：约4个新股票
-- 说明：每次API调用后等待{st.session_state.api_delay}秒
+- 说明：每次API调用后等待{ss.api_delay}秒
 
 💡 使用缓存后，查询速度<1秒！
             """)
@@ -3193,7 +3681,7 @@ def main():
         st.markdown("### 💾 缓存管理")
         
         # 获取缓存信息
-        cache_info = data_cache.get_cache_info()
+        cache_info = _cached_cache_info()
         
         st.write(f"**缓存统计：**")
         # 使用单列显示，避免侧边栏宽度不足导致文字截断
@@ -3222,20 +3710,22 @@ def main():
         col1, col2 = st.columns(2)
         if col1.button("🧹 清理过期", use_container_width=True):
             count = data_cache.clear_expired()
+            _cached_cache_info.clear()
             st.success(f"已清理 {count} 个")
             st.rerun()
-        
+
         if col2.button("🗑️ 清空全部", use_container_width=True):
             count = data_cache.clear_all()
+            _cached_cache_info.clear()
             st.success(f"已清空 {count} 个")
             st.rerun()
         
         st.divider()
         
         # 调试模式
-        st.session_state.debug_mode = st.checkbox(
+        ss.debug_mode = st.checkbox(
             "🔧 调试模式",
-            value=st.session_state.debug_mode,
+            value=ss.debug_mode,
             help="开启后显示详细调试信息和缓存统计"
         )
     
@@ -2,11 +2,109 @@
 """缓存管理模块 - 持久化缓存Tushare数据"""
 
 import os
+import re
 import json
 import time
+import atexit
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Any, Optional
 from datetime import datetime, timedelta
 
+import numpy as np
+import pandas as pd
+
+# 可选依赖：orjson解析/序列化比标准库json快3-5倍，未安装时退回json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 非法文件名字符（预编译一次，避免每次get/set都重新查regex缓存）
+_UNSAFE_CHARS_RE = re.compile(r'[^a-zA-Z0-9_-]')
+
+# Windows保留名（CON, PRN, AUX等）
+_RESERVED_NAMES = frozenset({
+    'CON', 'PRN', 'AUX', 'NUL',
+    'COM1', 'COM2', 'COM3', 'COM4', 'COM5', 'COM6', 'COM7', 'COM8', 'COM9',
+    'LPT1', 'LPT2', 'LPT3', 'LPT4', 'LPT5', 'LPT6', 'LPT7', 'LPT8', 'LPT9',
+})
+
+
+@lru_cache(maxsize=4096)
+def _safe_filename(key: str) -> str:
+    """
+    缓存键→安全文件名（纯函数，lru_cache记忆）
+
+    每次get/set/delete都要算一遍文件名，而键空间有限（股票代码等），
+    lru_cache后重复键的路径构造只剩一次字典查找。
+    安全处理逻辑与原_get_cache_path一致：过长键MD5哈希、
+    非法字符替换、basename防路径遍历、Windows保留名规避。
+    """
+    # 1. 验证key不为空
+    if not key or not key.strip():
+        raise ValueError("缓存键不能为空")
+
+    # 2. 处理过长文件名（Windows限制255字符，Linux限制255字节）
+    if len(key) > 200:
+        # 使用hash避免过长文件名
+        key_hash = hashlib.md5(key.encode('utf-8')).hexdigest()
+        safe_key = f"{key[:50]}_{key_hash}"
+    else:
+        # 替换所有非字母数字字符为下划线，保留连字符和下划线
+        safe_key = _UNSAFE_CHARS_RE.sub('_', key)
+
+    # 3. 防止路径遍历攻击（确保只使用文件名，不包含路径分隔符）
+    safe_key = os.path.basename(safe_key)
+
+    # 4. Windows保留名检查
+    if safe_key.upper() in _RESERVED_NAMES:
+        safe_key = f"_{safe_key}"
+
+    return f"{safe_key}.json"
+
+
+def convert_to_native(obj):
+    """
+    递归转换numpy/pandas类型为Python原生类型（供JSON序列化）
+
+    DataFrame/Series/ndarray走向量化快速路径：整列在pandas的C层一次
+    转换，不再逐个元素过isinstance链。DataFrame输出列主序dict，
+    与metrics缓存的to_dict('list')约定一致（pd.DataFrame两种都能还原）
+    """
+    if isinstance(obj, pd.DataFrame):
+        return {col: convert_to_native(obj[col]) for col in obj.columns}
+    if isinstance(obj, pd.Series):
+        if pd.api.types.is_datetime64_any_dtype(obj):
+            # 先astype(object)再where：str dtype下where(None)会保留NaN
+            return obj.dt.strftime('%Y-%m-%dT%H:%M:%S').astype(object).where(obj.notna(), None).tolist()
+        if obj.dtype != object:
+            # 数值/布尔列：tolist()在C层转原生类型，NaN→None
+            return obj.astype(object).where(obj.notna(), None).tolist()
+        return [convert_to_native(item) for item in obj.tolist()]
+    if isinstance(obj, np.ndarray):
+        # tolist()把numpy标量转成原生类型，仅剩NaN需要递归处理
+        return [convert_to_native(item) for item in obj.tolist()]
+
+    if isinstance(obj, (np.integer, np.int64, np.int32)):
+        return int(obj)
+    elif isinstance(obj, (np.floating, np.float64, np.float32)):
+        return float(obj) if not pd.isna(obj) else None
+    elif isinstance(obj, np.bool_):
+        return bool(obj)
+    elif isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    elif isinstance(obj, dict):
+        return {k: convert_to_native(v) for k, v in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        return [convert_to_native(item) for item in obj]
+    elif pd.isna(obj):
+        return None
+    else:
+        return obj
+
 
 class DataCache:
     """
@@ -31,51 +129,49 @@ class DataCache:
         self.cache_dir = cache_dir
         self.expire_seconds = expire_hours * 3600
         os.makedirs(cache_dir, exist_ok=True)
+
+        # 写缓冲：set()只把数据放入内存字典，后台线程每5秒批量落盘。
+        # 批量筛选时避免每只股票每次API调用都触发一次完整的JSON写入，
+        # 把热路径上的IO等待移到后台。进程退出时atexit兜底刷盘。
+        self._dirty: dict = {}
+        self._dirty_lock = threading.Lock()
+        self._flush_interval = 5
+
+        # 读侧内存缓存：{key: (文件mtime, 已解析数据)}，LRU上限256条。
+        # 一个会话内同一股票的缓存常被反复读取（rerun/切页），命中时
+        # 直接返回内存对象，省去重复的文件读取+JSON解析；
+        # mtime不一致说明文件被其他写入更新，自动失效重读
+        self._mem: OrderedDict = OrderedDict()
+        self._mem_lock = threading.Lock()
+        self._mem_max = 256
+
+        # 元数据索引：{文件名: {'ts': 写入时间, 'size': 字节数}}。
+        # get_cache_info()每次侧边栏重渲染都会调用，有索引后统计完全在
+        # 内存中完成，不再随缓存文件数量线性扫描目录。
+        # 索引随刷盘线程debounce持久化到_index.json，丢失时自动重建。
+        self._index_path = os.path.join(cache_dir, '_index.json')
+        self._index_lock = threading.Lock()
+        self._index_dirty = False
+        self._index = self._load_index()
+
+        flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        flusher.start()
+        atexit.register(self._flush_now)
     
     def _get_cache_path(self, key: str) -> str:
         """
         获取缓存文件路径（私有方法）
-        
-        安全机制：
-        1. 验证key非空
-        2. 对过长key进行MD5哈希
-        3. 替换非法字符
-        4. 使用os.path.basename防止路径遍历
-        5. 处理Windows保留文件名
-        
+
+        安全处理（非空校验、过长key哈希、非法字符替换、路径遍历防护、
+        Windows保留名规避）由模块级_safe_filename完成并记忆
+
         参数:
             key: 缓存键
-            
+
         返回:
             安全的缓存文件绝对路径
         """
-        import re
-        import hashlib
-        
-        # 1. 验证key不为空
-        if not key or not key.strip():
-            raise ValueError("缓存键不能为空")
-        
-        # 2. 处理过长文件名（Windows限制255字符，Linux限制255字节）
-        if len(key) > 200:
-            # 使用hash避免过长文件名
-            key_hash = hashlib.md5(key.encode('utf-8')).hexdigest()
-            safe_key = f"{key[:50]}_{key_hash}"
-        else:
-            # 替换所有非字母数字字符为下划线，保留连字符和下划线
-            safe_key = re.sub(r'[^a-zA-Z0-9_-]', '_', key)
-        
-        # 3. 防止路径遍历攻击（确保只使用文件名，不包含路径分隔符）
-        safe_key = os.path.basename(safe_key)
-        
-        # 4. Windows保留名检查（CON, PRN, AUX等）
-        reserved_names = {'CON', 'PRN', 'AUX', 'NUL', 
-                          'COM1', 'COM2', 'COM3', 'COM4', 'COM5', 'COM6', 'COM7', 'COM8', 'COM9',
-                          'LPT1', 'LPT2', 'LPT3', 'LPT4', 'LPT5', 'LPT6', 'LPT7', 'LPT8', 'LPT9'}
-        if safe_key.upper() in reserved_names:
-            safe_key = f"_{safe_key}"
-        
-        return os.path.join(self.cache_dir, f"{safe_key}.json")
+        return os.path.join(self.cache_dir, _safe_filename(key))
     
     def get_cache_file_path(self, key: str) -> str:
         """
@@ -99,24 +195,52 @@ class DataCache:
         返回:
             缓存的数据，如果不存在或已过期则返回None
         """
+        # 先查写缓冲：刚set()尚未落盘的数据直接从内存返回
+        with self._dirty_lock:
+            pending = self._dirty.get(key)
+        if pending is not None:
+            return pending.get('data')
+
         cache_path = self._get_cache_path(key)
-        
-        if not os.path.exists(cache_path):
+
+        try:
+            mtime = os.stat(cache_path).st_mtime
+        except OSError:
             return None
-        
+
+        # 再查读侧内存缓存：mtime一致说明文件未变，直接返回已解析数据
+        with self._mem_lock:
+            memo = self._mem.get(key)
+            if memo is not None and memo[0] == mtime:
+                self._mem.move_to_end(key)
+                return memo[1]
+
         try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-            
+            with open(cache_path, 'rb') as f:
+                raw = f.read()
+            cache_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+
             # 检查是否过期
             cached_time = cache_data.get('timestamp', 0)
             if time.time() - cached_time > self.expire_seconds:
                 # 缓存已过期，删除文件
                 os.remove(cache_path)
+                self._index_drop(cache_path)
+                with self._mem_lock:
+                    self._mem.pop(key, None)
                 return None
-            
-            return cache_data.get('data')
-            
+
+            data = cache_data.get('data')
+
+            # 记入内存缓存，超出上限时按LRU淘汰最久未用的条目
+            with self._mem_lock:
+                self._mem[key] = (mtime, data)
+                self._mem.move_to_end(key)
+                while len(self._mem) > self._mem_max:
+                    self._mem.popitem(last=False)
+
+            return data
+
         except Exception as e:
             print(f"读取缓存失败 {key}: {e}")
             return None
@@ -127,42 +251,21 @@ class DataCache:
         
         特性：
         1. 自动转换numpy/pandas类型为Python原生类型
-        2. 使用临时文件+重命名实现原子写入，防止文件损坏
-        
+        2. 写入先进入内存缓冲，由后台线程批量落盘（延迟≤5秒）
+        3. 落盘使用临时文件+重命名实现原子写入，防止文件损坏
+
         参数:
             key: 缓存键
             data: 要缓存的数据
-            
+
         返回:
             是否保存成功
         """
-        cache_path = self._get_cache_path(key)
-        
         try:
+            # 提前校验key合法性，非法key在这里就报错而不是留到后台线程
+            self._get_cache_path(key)
+
             # 转换numpy/pandas类型为Python原生类型（修复JSON序列化问题）
-            def convert_to_native(obj):
-                """递归转换numpy/pandas类型为Python原生类型"""
-                import numpy as np
-                import pandas as pd
-                
-                if isinstance(obj, (np.integer, np.int64, np.int32)):
-                    return int(obj)
-                elif isinstance(obj, (np.floating, np.float64, np.float32)):
-                    return float(obj) if not pd.isna(obj) else None
-                elif isinstance(obj, np.bool_):
-                    return bool(obj)
-                elif isinstance(obj, pd.Timestamp):
-                    return obj.isoformat()
-                elif isinstance(obj, dict):
-                    return {k: convert_to_native(v) for k, v in obj.items()}
-                elif isinstance(obj, (list, tuple)):
-                    return [convert_to_native(item) for item in obj]
-                elif pd.isna(obj):
-                    return None
-                else:
-                    return obj
-            
-            # 转换数据
             converted_data = convert_to_native(data)
             
             cache_data = {
@@ -170,29 +273,158 @@ class DataCache:
                 'datetime': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'data': converted_data
             }
-            
+
+            # 只进内存缓冲，立即返回；落盘交给后台线程批量处理
+            with self._dirty_lock:
+                self._dirty[key] = cache_data
+
+            # 旧值失效（落盘后mtime变化也会自然失效，这里提前清理）
+            with self._mem_lock:
+                self._mem.pop(key, None)
+
+            return True
+
+        except Exception as e:
+            print(f"保存缓存失败 {key}: {e}")
+            return False
+
+    def _write_entry(self, key: str, cache_data: dict) -> None:
+        """
+        将单条缓存数据原子写入文件（仅供刷盘线程/atexit调用）
+        """
+        cache_path = self._get_cache_path(key)
+        temp_path = cache_path + '.tmp'
+        try:
             # 使用临时文件写入，成功后再替换（避免写入中断导致文件损坏）
+            # 紧凑格式（无缩进/空格）：财务数据payload体积缩小一半以上，
+            # 序列化也更快；调试时可用json.tool随时格式化查看
             os.makedirs(os.path.dirname(cache_path), exist_ok=True)
-            temp_path = cache_path + '.tmp'
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
-            
+            with open(temp_path, 'wb') as f:
+                if orjson is not None:
+                    f.write(orjson.dumps(cache_data, option=orjson.OPT_SERIALIZE_NUMPY))
+                else:
+                    f.write(json.dumps(cache_data, ensure_ascii=False,
+                                       separators=(',', ':')).encode('utf-8'))
+
             # 原子替换（避免并发写入问题）
             os.replace(temp_path, cache_path)
-            
-            return True
-            
+            self._index_put(cache_path)
+
         except Exception as e:
             print(f"保存缓存失败 {key}: {e}")
             # 清理临时文件（如果存在）
-            temp_path = cache_path + '.tmp'
             if os.path.exists(temp_path):
                 try:
                     os.remove(temp_path)
                 except:
                     pass
-            return False
-    
+
+    def _flush_now(self) -> None:
+        """
+        立即将写缓冲中的全部数据落盘
+        """
+        with self._dirty_lock:
+            if not self._dirty:
+                return
+            pending, self._dirty = self._dirty, {}
+
+        for key, cache_data in pending.items():
+            self._write_entry(key, cache_data)
+
+    def _flush_loop(self) -> None:
+        """
+        后台刷盘循环（守护线程）：每隔几秒批量写出脏数据
+        """
+        while True:
+            time.sleep(self._flush_interval)
+            try:
+                self._flush_now()
+                self._persist_index()
+            except Exception as e:
+                print(f"缓存刷盘失败: {e}")
+
+    def _load_index(self) -> dict:
+        """
+        加载元数据索引；文件缺失或损坏时扫描目录重建一次
+        """
+        try:
+            with open(self._index_path, 'rb') as f:
+                raw = f.read()
+            index = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            if isinstance(index, dict):
+                return index
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"读取缓存索引失败: {e}")
+
+        return self._rebuild_index()
+
+    def _rebuild_index(self) -> dict:
+        """
+        扫描缓存目录重建索引（仅在索引缺失/损坏时执行一次）
+
+        文件mtime即写入时间（原子写入保证），作为索引的ts字段。
+        """
+        index = {}
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    filename = entry.name
+                    if not filename.endswith('.json') or filename.endswith('.tmp.json'):
+                        continue
+                    if filename == '_index.json':
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    index[filename] = {'ts': stat.st_mtime, 'size': stat.st_size}
+        except Exception as e:
+            print(f"重建缓存索引失败: {e}")
+
+        self._index_dirty = True
+        return index
+
+    def _persist_index(self) -> None:
+        """
+        将索引持久化到_index.json（仅在有变更时写入）
+        """
+        with self._index_lock:
+            if not self._index_dirty:
+                return
+            snapshot = dict(self._index)
+            self._index_dirty = False
+
+        temp_path = self._index_path + '.tmp'
+        try:
+            with open(temp_path, 'wb') as f:
+                if orjson is not None:
+                    f.write(orjson.dumps(snapshot))
+                else:
+                    f.write(json.dumps(snapshot, ensure_ascii=False).encode('utf-8'))
+            os.replace(temp_path, self._index_path)
+        except Exception as e:
+            print(f"保存缓存索引失败: {e}")
+
+    def _index_put(self, cache_path: str) -> None:
+        """落盘成功后登记/更新索引条目"""
+        filename = os.path.basename(cache_path)
+        try:
+            size = os.path.getsize(cache_path)
+        except OSError:
+            size = 0
+        with self._index_lock:
+            self._index[filename] = {'ts': time.time(), 'size': size}
+            self._index_dirty = True
+
+    def _index_drop(self, cache_path: str) -> None:
+        """文件删除后移除索引条目"""
+        filename = os.path.basename(cache_path)
+        with self._index_lock:
+            if self._index.pop(filename, None) is not None:
+                self._index_dirty = True
+
     def delete(self, key: str) -> bool:
         """
         删除指定缓存
@@ -204,10 +436,17 @@ class DataCache:
             是否删除成功
         """
         cache_path = self._get_cache_path(key)
-        
+
         try:
+            # 同步丢弃写缓冲与读缓存中的数据
+            with self._dirty_lock:
+                self._dirty.pop(key, None)
+            with self._mem_lock:
+                self._mem.pop(key, None)
+
             if os.path.exists(cache_path):
                 os.remove(cache_path)
+            self._index_drop(cache_path)
             return True
         except Exception as e:
             print(f"删除缓存失败 {key}: {e}")
@@ -222,52 +461,73 @@ class DataCache:
         """
         count = 0
         try:
+            # 同步丢弃写缓冲与读缓存中的数据
+            with self._dirty_lock:
+                self._dirty.clear()
+            with self._mem_lock:
+                self._mem.clear()
+
             for filename in os.listdir(self.cache_dir):
                 if filename.endswith('.json'):
                     os.remove(os.path.join(self.cache_dir, filename))
-                    count += 1
+                    if filename != '_index.json':
+                        count += 1
+
+            # 重置索引
+            with self._index_lock:
+                self._index.clear()
+                self._index_dirty = True
         except Exception as e:
             print(f"清空缓存失败: {e}")
-        
+
         return count
     
     def clear_expired(self) -> int:
         """
         清理所有过期缓存
-        
+
+        性能说明：
+        基于内存索引判断过期，不再打开或stat每个缓存文件。
+
         返回:
             清理的文件数量
         """
         count = 0
+        now = time.time()
         try:
-            for filename in os.listdir(self.cache_dir):
-                if not filename.endswith('.json'):
+            with self._index_lock:
+                snapshot = list(self._index.items())
+
+            for filename, meta in snapshot:
+                if now - meta.get('ts', 0) <= self.expire_seconds:
                     continue
-                
+
                 cache_path = os.path.join(self.cache_dir, filename)
-                
                 try:
-                    with open(cache_path, 'r', encoding='utf-8') as f:
-                        cache_data = json.load(f)
-                    
-                    cached_time = cache_data.get('timestamp', 0)
-                    if time.time() - cached_time > self.expire_seconds:
-                        os.remove(cache_path)
-                        count += 1
-                except:
-                    # 如果读取失败，也删除
                     os.remove(cache_path)
                     count += 1
-                    
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    # 删除失败（文件可能被占用），保留索引下次再试
+                    continue
+                self._index_drop(cache_path)
+
         except Exception as e:
             print(f"清理过期缓存失败: {e}")
-        
+
         return count
     
     def get_cache_info(self) -> dict:
         """
         获取缓存统计信息（按类型分类）
-        
+
+        性能说明：
+        该方法在侧边栏每次重渲染时都会执行。旧实现逐个打开并解析
+        全部JSON文件（O(N)次IO+解析），文件多时明显拖慢交互。
+        现在统计完全基于内存索引完成，与缓存文件数量无关，
+        整个过程零文件系统访问。
+
         返回:
             包含总数、有效数、过期数、大小、过期时间配置的字典
         """
@@ -275,7 +535,7 @@ class DataCache:
         valid = 0
         expired = 0
         total_size = 0
-        
+
         # 按类型分类统计
         financial_valid = 0  # 财务数据缓存（有效）
         financial_expired = 0  # 财务数据缓存（过期）
@@ -283,97 +543,53 @@ class DataCache:
         company_expired = 0  # 公司信息缓存（过期）
         user_valid = 0  # 用户积分缓存（有效）
         user_expired = 0  # 用户积分缓存（过期）
-        
+
+        now = time.time()
         try:
-            for filename in os.listdir(self.cache_dir):
-                # 只统计.json文件，排除临时文件（.tmp）和隐藏文件
-                if not filename.endswith('.json') or filename.endswith('.tmp.json'):
-                    continue
-                
-                # 排除临时文件（原子写入时使用的.tmp文件）
-                if filename.endswith('.tmp'):
-                    continue
-                
-                cache_path = os.path.join(self.cache_dir, filename)
-                
-                # 检查文件是否存在且可读
-                if not os.path.exists(cache_path):
-                    continue
-                
-                try:
-                    file_size = os.path.getsize(cache_path)
-                    total += 1
-                    total_size += file_size
-                    
-                    # 尝试读取缓存文件
-                    with open(cache_path, 'r', encoding='utf-8') as f:
-                        cache_data = json.load(f)
-                    
-                    cached_time = cache_data.get('timestamp', 0)
-                    
-                    # 判断缓存类型和有效期
-                    is_expired = False
-                    if cached_time == 0:
-                        is_expired = True
-                    else:
-                        # 根据缓存类型判断有效期
-                        if filename.startswith('company_info_'):
-                            # 公司信息缓存：30天有效期
-                            expire_seconds = 30 * 24 * 3600
-                        elif filename.startswith('user_points_'):
-                            # 用户积分缓存：24小时有效期
-                            expire_seconds = 24 * 3600
-                        else:
-                            # 财务数据缓存：24小时有效期（默认）
-                            expire_seconds = self.expire_seconds
-                        
-                        if time.time() - cached_time > expire_seconds:
-                            is_expired = True
-                    
-                    # 按类型分类统计
-                    if filename.startswith('company_info_'):
-                        if is_expired:
-                            company_expired += 1
-                            expired += 1
-                        else:
-                            company_valid += 1
-                            valid += 1
-                    elif filename.startswith('user_points_'):
-                        if is_expired:
-                            user_expired += 1
-                            expired += 1
-                        else:
-                            user_valid += 1
-                            valid += 1
-                    else:
-                        # 财务数据缓存或其他
-                        if is_expired:
-                            financial_expired += 1
-                            expired += 1
-                        else:
-                            financial_valid += 1
-                            valid += 1
-                            
-                except (json.JSONDecodeError, IOError, OSError) as e:
-                    # 文件损坏、正在写入或读取失败，认为是过期缓存
-                    # 根据文件名判断类型
-                    if filename.startswith('company_info_'):
+            with self._index_lock:
+                snapshot = list(self._index.items())
+
+            for filename, meta in snapshot:
+                total += 1
+                total_size += meta.get('size', 0)
+
+                # 根据缓存类型判断有效期
+                if filename.startswith('company_info_'):
+                    # 公司信息缓存：30天有效期
+                    expire_seconds = 30 * 24 * 3600
+                elif filename.startswith('user_points_'):
+                    # 用户积分缓存：24小时有效期
+                    expire_seconds = 24 * 3600
+                else:
+                    # 财务数据缓存：使用默认有效期
+                    expire_seconds = self.expire_seconds
+
+                is_expired = now - meta.get('ts', 0) > expire_seconds
+
+                # 按类型分类统计
+                if filename.startswith('company_info_'):
+                    if is_expired:
                         company_expired += 1
-                    elif filename.startswith('user_points_'):
-                        user_expired += 1
+                        expired += 1
                     else:
-                        financial_expired += 1
-                    expired += 1
-                except Exception as e:
-                    # 其他异常，也认为是过期缓存
-                    if filename.startswith('company_info_'):
-                        company_expired += 1
-                    elif filename.startswith('user_points_'):
+                        company_valid += 1
+                        valid += 1
+                elif filename.startswith('user_points_'):
+                    if is_expired:
                         user_expired += 1
+                        expired += 1
                     else:
+                        user_valid += 1
+                        valid += 1
+                else:
+                    # 财务数据缓存或其他
+                    if is_expired:
                         financial_expired += 1
-                    expired += 1
-                    
+                        expired += 1
+                    else:
+                        financial_valid += 1
+                        valid += 1
+
         except Exception as e:
             print(f"获取缓存信息失败: {e}")
         
@@ -55,3 +55,11 @@ SECTOR_RULES = {
         "description": "通用标准"
     }
 }
+
+# 阈值紧凑版：行业名 -> (资产负债率上限, 毛利率下限)
+# 评估热路径直接取元组解包，免去嵌套字典二次查找；
+# SECTOR_RULES仍保留name/description供UI展示
+SECTOR_THRESHOLDS = {
+    name: (rules["debt_ratio_max"], rules["gross_margin_min"])
+    for name, rules in SECTOR_RULES.items()
+}
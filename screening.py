@@ -32,6 +32,7 @@ A股全网筛选系统核心模块
 """
 
 from typing import Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 import time
 from datetime import datetime
@@ -41,10 +42,31 @@ from utils import (
     get_pro_client, analyze_fundamentals, fetch_valuation_data,
     AuditRecord, run_connectivity_tests
 )
-from valuation import PRValuation
+from valuation import PRValuation, analyze_stock_valuation_cached
 from cache_manager import data_cache
 
 
+def _cashflow_kernel(ocf: np.ndarray, ni: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    现金流质量检查的数组核心（纯NumPy，无DataFrame依赖）
+
+    一次性比较出每年的两个布尔判定，供筛选热循环复用：
+    - 经营现金流是否≥0
+    - 经营现金流是否覆盖净利润
+
+    NaN参与比较时结果为False，与utils中生成
+    cashflow_positive/cashflow_ge_profit列的语义一致。
+
+    参数:
+        ocf: 经营现金流数组（n_cashflow_act）
+        ni: 净利润数组（n_income）
+
+    返回:
+        (positive数组, cover_profit数组)
+    """
+    return ocf >= 0, ocf >= ni
+
+
 class StockScreener:
     """A股全网筛选器"""
 
@@ -186,29 +208,34 @@ class StockScreener:
         if not metrics.empty:
             # 取前N年
             recent_years = metrics.head(required_years)
-            
+
+            # 一次性提取为数组后交给数组核心，替代逐行布尔判断
+            ocf_ni = recent_years[['n_cashflow_act', 'n_income']].to_numpy(dtype=np.float64)
+            positive_arr, cover_arr = _cashflow_kernel(ocf_ni[:, 0], ocf_ni[:, 1])
+
             # 检查近N年经营现金流是否全部≥0
-            all_positive = recent_years['cashflow_positive'].all() if len(recent_years) > 0 else False
+            all_positive = bool(positive_arr.all()) if len(recent_years) > 0 else False
             results['cashflow_pass'] = all_positive
-            
+
             # 检查近N年现金流是否覆盖净利润
-            all_cover_profit = recent_years['cashflow_ge_profit'].all() if len(recent_years) > 0 else False
+            all_cover_profit = bool(cover_arr.all()) if len(recent_years) > 0 else False
             results['cashflow_ge_profit'] = all_cover_profit
-            
+
             # 记录现金流详情（用于展示）
+            years = recent_years['end_date'].str[:4].tolist()
             results['cashflow_details'] = {
                 'years_checked': len(recent_years),
                 'all_positive': all_positive,
                 'all_cover_profit': all_cover_profit,
                 'yearly_cashflow': [
                     {
-                        'year': row['end_date'][:4],
-                        'ocf': row.get('n_cashflow_act', 0),
-                        'net_income': row.get('n_income', 0),
-                        'positive': row.get('cashflow_positive', False),
-                        'cover_profit': row.get('cashflow_ge_profit', False)
+                        'year': years[i],
+                        'ocf': ocf_ni[i, 0],
+                        'net_income': ocf_ni[i, 1],
+                        'positive': bool(positive_arr[i]),
+                        'cover_profit': bool(cover_arr[i])
                     }
-                    for _, row in recent_years.iterrows()
+                    for i in range(len(recent_years))
                 ]
             }
         else:
@@ -222,13 +249,58 @@ class StockScreener:
                 results['cashflow_pass'] and 
                 results['cashflow_ge_profit']), results
 
+    def fetch_valuation_snapshot(self, trade_date: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        批量预取全市场每日指标快照（close/pe_ttm）
+
+        daily_basic支持按交易日一次返回全市场数据，筛选前预取一次，
+        循环内逐股查表即可，替代N次逐股的每日指标请求。
+        快照按交易日落盘缓存，同一天内重复筛选不再请求接口。
+
+        参数:
+            trade_date: 交易日期YYYYMMDD，默认今天；
+                遇到非交易日自动向前回溯（最多7天）
+
+        返回:
+            {ts_code: {'close': ..., 'pe_ttm': ..., 'trade_date': ...}}，
+            获取失败时返回空字典（调用方降级为逐股请求）
+        """
+        from datetime import timedelta
+
+        base_date = trade_date or datetime.now().strftime("%Y%m%d")
+        cache_key = f"valuation_snapshot_{base_date}"
+
+        snapshot = data_cache.get(cache_key)
+        if snapshot:
+            return snapshot
+
+        try:
+            # 非交易日（周末/节假日）当天无数据，向前回溯找最近交易日
+            day = datetime.strptime(base_date, "%Y%m%d")
+            for _ in range(7):
+                df = self.pro.daily_basic(
+                    trade_date=day.strftime("%Y%m%d"),
+                    fields='ts_code,trade_date,close,pe_ttm'
+                )
+                if not df.empty:
+                    snapshot = df.set_index('ts_code').to_dict('index')
+                    data_cache.set(cache_key, snapshot)
+                    print(f"✅ 已预取 {len(snapshot)} 只股票的估值快照（{day.strftime('%Y%m%d')}）")
+                    return snapshot
+                day -= timedelta(days=1)
+        except Exception as e:
+            print(f"⚠️ 预取估值快照失败，降级为逐股请求: {e}")
+
+        return {}
+
     def check_valuation_pass(self,
                            ts_code: str,
                            pr_threshold: float = 1.0,
-                           min_roe: float = 0.0) -> Tuple[bool, Dict]:
+                           min_roe: float = 0.0,
+                           val_row: Optional[Dict] = None) -> Tuple[bool, Dict]:
         """
         检查估值筛选条件
-        
+
         ⚠️ 重要：此函数必须使用最新的价格数据！
         - 每次调用都会获取最新交易日的收盘价和PE
         - 价格数据不会使用缓存（因为每天变化）
@@ -238,27 +310,35 @@ class StockScreener:
             ts_code: 股票代码
             pr_threshold: 市赚率阈值
             min_roe: 最低ROE要求(%)
+            val_row: 预取快照中本股的每日指标行（见fetch_valuation_snapshot），
+                提供后跳过逐股的daily_basic请求
 
         返回:
             (是否通过, 估值结果详情)
         """
         try:
             # 获取最新交易日的估值数据
-            # ⚠️ 注意：fetch_valuation_data 不使用缓存，每次都获取最新价格和PE
-            # 这是正确的，因为价格每天变化，必须使用最新数据计算PR
+            # ⚠️ 注意：价格每天变化，必须使用最新数据计算PR，
+            # 因此估值分析结果按(代码, 交易日)落盘缓存：同一天内调整
+            # PR/ROE阈值重新筛选时只做阈值过滤，不再重复请求接口
             today = datetime.now().strftime("%Y%m%d")
 
-            valuation_data = fetch_valuation_data(ts_code, today, "个股")
+            cache_key = f"screen_valuation_{ts_code}_{today}"
+            result = data_cache.get(cache_key)
+
+            if result is None:
+                valuation_data = fetch_valuation_data(ts_code, today, "个股", daily_row=val_row)
 
-            if valuation_data is None:
-                return False, {'error': '无法获取估值数据'}
+                if valuation_data is None:
+                    return False, {'error': '无法获取估值数据'}
 
-            # 计算修正市赚率（按照市赚率估值分析模块的方式）
-            # 使用PRValuation.analyze_stock_valuation()会自动计算：
-            # 1. 股息支付率
-            # 2. 修正系数N
-            # 3. 修正市赚率 = N × PE / ROE / 150
-            result = PRValuation.analyze_stock_valuation(valuation_data)
+                # 计算修正市赚率（按照市赚率估值分析模块的方式）
+                # 使用PRValuation.analyze_stock_valuation()会自动计算：
+                # 1. 股息支付率
+                # 2. 修正系数N
+                # 3. 修正市赚率 = N × PE / ROE / 150
+                result = analyze_stock_valuation_cached(valuation_data)
+                data_cache.set(cache_key, result)
 
             if result['corrected_pr'] is None and result['standard_pr'] is None:
                 return False, {'error': '无法计算市赚率'}
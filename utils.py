@@ -31,7 +31,7 @@ import json  # JSON处理（用于缓存）
 from datetime import datetime  # 日期时间处理
 from dataclasses import dataclass  # 结构化审计信息
 from functools import lru_cache  # 缓存客户端实例
-from typing import Any, Dict, List, Optional, Tuple  # 类型提示
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple  # 类型提示
 
 import pandas as pd  # DataFrame 处理
 import requests  # HTTP 测试
@@ -107,7 +107,9 @@ def get_user_points_info(token: Optional[str] = None) -> Optional[Dict]:
             'total_points': float(total_points),
             'nearest_expiry_date': nearest_expiry.strftime('%Y-%m-%d') if pd.notna(nearest_expiry) else None,
             'nearest_expiry_points': float(nearest_expiry_points) if pd.notna(nearest_expiry) else 0,
-            'expiry_records': df.to_dict('records')
+            # 按列存（dict of lists）：pd.DataFrame(映射)走快速构建路径，
+            # 不必对逐行dict做每行类型推断
+            'expiry_records': df.to_dict('list')
         }
     except Exception as e:
         print(f"查询积分信息失败: {e}")
@@ -263,36 +265,67 @@ class AuditRecord:
         return "标准无保留意见" in (self.audit_result or "")
 
 
+class ValuationSnapshot(NamedTuple):
+    """
+    市赚率计算所需的估值数据快照。
+
+    固定字段的具名元组替代裸字典：PR页面对这些字段的访问多达20+次，
+    属性访问比dict.get更快，且字段名拼错会在开发期直接报AttributeError。
+    """
+
+    ts_code: str
+    trade_date: str
+    close: Optional[float]
+    pe_ttm: Optional[float]
+    roe_waa: Optional[float]
+    eps: Optional[float]
+    dividend_per_share: Optional[float]
+    data_source: str
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """dict风格访问，兼容按字典使用的旧调用方。"""
+        return getattr(self, key, default)
+
+
 def fetch_valuation_data(
     ts_code: str,
     trade_date: str,
     target_type: str = "个股",
-) -> Optional[Dict[str, Any]]:
+    daily_row: Optional[Dict[str, Any]] = None,
+) -> Optional[ValuationSnapshot]:
     """
     获取市赚率计算所需的估值数据
-    
+
     ⚠️ 重要：此函数不应使用缓存！
     - 价格数据（close, pe_ttm）每天变化，必须获取最新数据才能准确计算PR
     - 如果未来为了性能优化需要添加缓存，缓存时间不应超过1小时
     - 建议：在同一天内可以缓存，但跨天必须重新获取
-    
+
     参数:
         ts_code: 股票代码
         trade_date: 交易日期，格式YYYYMMDD
         target_type: 标的类型（个股/宽基指数）
-        
+        daily_row: 预取的每日指标行（含close/pe_ttm）。
+            全网筛选会先用daily_basic一次拉取全市场快照，
+            传入后可跳过逐股的每日指标请求
+
     返回:
-        包含pe_ttm, roe_waa, eps, dividend等字段的字典
+        包含pe_ttm, roe_waa, eps, dividend等字段的ValuationSnapshot
     """
     try:
         pro = get_pro_client()
-        
+
         # 1. 获取每日指标（pe_ttm, close等）
         pe_ttm = None
         close_price = None
         data_source = "daily_basic"
 
-        if target_type == "宽基指数":
+        if target_type == "个股" and daily_row is not None:
+            # 使用批量预取的全市场快照，省掉逐股daily_basic请求
+            pe_ttm = daily_row.get("pe_ttm")
+            close_price = daily_row.get("close")
+            data_source = "daily_basic_snapshot"
+        elif target_type == "宽基指数":
             index_df = pro.index_dailybasic(
                 ts_code=ts_code,
                 trade_date=trade_date,
@@ -382,16 +415,16 @@ def fetch_valuation_data(
                 latest_div = source_df.iloc[0]
                 dividend_per_share = latest_div.get("cash_div")
         
-        return {
-            'ts_code': ts_code,
-            'trade_date': trade_date,
-            'close': close_price,
-            'pe_ttm': pe_ttm,
-            'roe_waa': roe_waa,
-            'eps': eps,
-            'dividend_per_share': dividend_per_share,
-            'data_source': data_source,
-        }
+        return ValuationSnapshot(
+            ts_code=ts_code,
+            trade_date=trade_date,
+            close=close_price,
+            pe_ttm=pe_ttm,
+            roe_waa=roe_waa,
+            eps=eps,
+            dividend_per_share=dividend_per_share,
+            data_source=data_source,
+        )
     except Exception as e:
         print(f"获取估值数据失败: {e}")
         return None
@@ -1416,9 +1449,12 @@ def analyze_fundamentals(
         
         # 准备缓存数据
         # 注意：data_cache.set会自动处理numpy类型的转换
+        # metrics按列存（dict of lists）：列名只写一次，JSON体积明显小于
+        # 逐行records，且pd.DataFrame(映射)走快速构建路径；
+        # 旧版records格式的缓存文件pd.DataFrame同样能直接还原
         cache_data = {
             'company_info': company_info,
-            'metrics_dict': merged.to_dict('records'),
+            'metrics_dict': merged.to_dict('list'),
             'cashflow_positive_years': int(merged["cashflow_positive"].sum()),
             'cashflow_cover_profit': bool(merged["cashflow_ge_profit"].all()),
             'audit_records': [
@@ -4,7 +4,10 @@
 基于市盈率和ROE的估值方法，判断买卖时机
 """
 
+from functools import lru_cache
 from typing import Dict, Optional, Tuple
+
+import numpy as np
 import pandas as pd
 
 
@@ -461,6 +464,19 @@ class PRValuation:
 
 
 # 使用示例和测试
+@lru_cache(maxsize=10000)
+def analyze_stock_valuation_cached(val_data) -> Dict:
+    """
+    analyze_stock_valuation的记忆化包装
+
+    估值快照（ValuationSnapshot，含ts_code/trade_date）是可哈希的
+    具名元组，直接作为缓存键：单股分析页和全网筛选对同一
+    (代码, 交易日)重复计算(支付率, 修正系数N, 修正PR)时零开销命中。
+    返回的结果字典为各调用方共享，调用方不应原地修改。
+    """
+    return PRValuation.analyze_stock_valuation(val_data)
+
+
 if __name__ == "__main__":
     # 示例1：个股估值（茅台）
     print("=" * 50)